@@ -4,7 +4,7 @@ from discord.ext import commands
 import json
 import os
 from dotenv import load_dotenv
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from filelock import FileLock
 import asyncio
 import yt_dlp
@@ -12,7 +12,20 @@ import random
 import io
 from discord.ui import View, Button, Select
 import requests
+import numpy as np
 from urllib.parse import parse_qs, urlparse
+import time
+import heapq
+import functools
+import cProfile
+import pstats
+import threading
+import sys
+import glob
+import collections
+from concurrent.futures import ThreadPoolExecutor
+import bisect
+import re
 
 load_dotenv()
 BOT_TOKEN = os.getenv("BOT_TOKEN")
@@ -23,6 +36,21 @@ YOUTUBE_CLIENT_ID = os.getenv("YOUTUBE_CLIENT_ID")
 YOUTUBE_CLIENT_SECRET = os.getenv("YOUTUBE_CLIENT_SECRET")
 YOUTUBE_REFRESH_TOKEN = os.getenv("YOUTUBE_REFRESH_TOKEN")
 SUBS_PER_PAGE = 15
+RESPONSE_BUDGET = 2.0
+RESPONSE_DEADLINE = 3.0
+DEADLINE_CONCURRENCY = 8
+PROFILE_SAMPLE_INTERVAL = 0.005
+STALL_THRESHOLD = 0.1
+LISTENING_PARTY_LOCAL_DIR = os.getenv("LISTENING_PARTY_LOCAL_DIR")
+LISTENING_PARTY_WORKERS = 2
+PREBUFFER_FRAMES = 50
+STATS_FILE = os.getenv("STATS_FILE") or os.path.splitext(DATA_FILE)[0] + "_stats.json"
+SEARCH_INDEX_FILE = os.getenv("SEARCH_INDEX_FILE") or os.path.splitext(DATA_FILE)[0] + "_search.json"
+SEARCH_INDEX_SAVE_DELAY = 30
+SLIM_MODE = os.getenv("SLIM_MODE", "false").lower() in ("1", "true", "yes")
+DISPLAY_NAME_TTL = 600
+INSIGHTS_CACHE_SIZE = 64
+STARTED_AT = time.monotonic()
 
 def load_data():
     lock = FileLock(DATA_FILE + ".lock")
@@ -38,6 +66,413 @@ def save_data(data):
         with open(DATA_FILE, "w") as f:
             json.dump(data, f, indent=2)
 
+def update_data(mutate):
+    # read, mutate and write under one lock; mutate returns an error message to abort without writing
+    lock = FileLock(DATA_FILE + ".lock")
+    with lock:
+        data = {}
+        if os.path.exists(DATA_FILE):
+            with open(DATA_FILE, "r") as f:
+                data = json.load(f)
+        error = mutate(data)
+        if error is None:
+            with open(DATA_FILE, "w") as f:
+                json.dump(data, f, indent=2)
+        return error
+
+def bump_search_version(data: dict) -> int:
+    # counts writes that change what the search index holds; the index stores the
+    # value it was saved at, so a copy that missed writes is rebuilt on startup
+    data["search_version"] = data.get("search_version", 0) + 1
+    return data["search_version"]
+
+def empty_stats() -> dict:
+    return {"leagues": 0, "rounds": 0, "players": {}, "artists": {}, "videos": {}, "themes": {}}
+
+def load_stats() -> dict:
+    lock = FileLock(STATS_FILE + ".lock")
+    with lock:
+        if not os.path.exists(STATS_FILE):
+            return empty_stats()
+        with open(STATS_FILE, "r") as f:
+            return json.load(f)
+
+def save_stats(stats: dict):
+    lock = FileLock(STATS_FILE + ".lock")
+    with lock:
+        with open(STATS_FILE, "w") as f:
+            json.dump(stats, f, indent=2)
+
+stats_cache = None
+
+def get_stats() -> dict:
+    global stats_cache
+    if stats_cache is None:
+        stats_cache = load_stats()
+    return stats_cache
+
+def player_stats(stats: dict, player_id: str) -> dict:
+    return stats["players"].setdefault(player_id, {
+        "points": 0,
+        "league_wins": 0,
+        "round_wins": 0,
+        "leagues_played": 0,
+        "submissions": 0,
+        "votes_given": 0,
+        "votes_received": 0
+    })
+
+def record_round_stats(stats: dict, round_record: dict):
+    stats["rounds"] += 1
+    theme = round_record.get("theme")
+    if theme:
+        stats["themes"][theme] = stats["themes"].get(theme, 0) + 1
+
+    for player_id, submission in round_record.get("submissions", {}).items():
+        player_stats(stats, player_id)["submissions"] += 1
+        artist = submission.get("artist")
+        if artist and artist != "Unknown Artist":
+            stats["artists"][artist] = stats["artists"].get(artist, 0) + 1
+        video_id = submission.get("video_id")
+        if video_id:
+            video = stats["videos"].setdefault(video_id, {"count": 0, "title": submission.get("title"), "artist": artist})
+            video["count"] += 1
+
+    for voter, vote_dict in round_record.get("votes", {}).items():
+        for target, vote_data in vote_dict.items():
+            amount = vote_data["amount"] if isinstance(vote_data, dict) else vote_data
+            player_stats(stats, voter)["votes_given"] += amount
+            player_stats(stats, target)["votes_received"] += amount
+
+    tally = round_record.get("tally", {})
+    for player_id, count in tally.items():
+        player_stats(stats, player_id)["points"] += count
+    top_score = max(tally.values(), default=0)
+    if top_score > 0:
+        for player_id, count in tally.items():
+            if count == top_score:
+                player_stats(stats, player_id)["round_wins"] += 1
+
+def record_league_stats(stats: dict, league: dict, winners: list):
+    stats["leagues"] += 1
+    for player_id in league.get("players", []):
+        player_stats(stats, player_id)["leagues_played"] += 1
+    for player_id in winners:
+        player_stats(stats, player_id)["league_wins"] += 1
+
+    # leagues that started before round history was kept only have the later rounds
+    # recorded; whatever the final scores hold beyond those tallies is credited here,
+    # once, so rebuilt and incremental totals agree
+    recorded = {}
+    for round_record in league.get("history", []):
+        for player_id, count in round_record.get("tally", {}).items():
+            recorded[player_id] = recorded.get(player_id, 0) + count
+    for player_id, points in league.get("scores", {}).items():
+        remainder = points - recorded.get(player_id, 0)
+        if remainder:
+            player_stats(stats, player_id)["points"] += remainder
+
+def league_winners(scores: dict) -> list:
+    top_score = max(scores.values(), default=0)
+    return [pid for pid, pts in scores.items() if pts == top_score]
+
+def rebuild_stats(data: dict) -> dict:
+    stats = empty_stats()
+    leagues = [league for key, league in data.items() if key != "finished_leagues" and isinstance(league, dict)]
+    finished = [league for history in data.get("finished_leagues", {}).values() for league in history]
+
+    for league in leagues + finished:
+        for round_record in league.get("history", []):
+            record_round_stats(stats, round_record)
+
+    for league in finished:
+        record_league_stats(stats, league, league_winners(league.get("scores", {})))
+
+    return stats
+
+def build_vote_arrays(history: list) -> tuple:
+    # votes[r, v, s]: votes from voter v to submitter s in round r
+    # submitted[r, s]: whether s had a song in round r
+    players = sorted({pid for round_record in history for pid in round_record.get("submissions", {})} |
+                     {pid for round_record in history for pid in round_record.get("votes", {})})
+    index = {pid: i for i, pid in enumerate(players)}
+    votes = np.zeros((len(history), len(players), len(players)))
+    submitted = np.zeros((len(history), len(players)), dtype=bool)
+
+    for r, round_record in enumerate(history):
+        for pid in round_record.get("submissions", {}):
+            submitted[r, index[pid]] = True
+        for voter, vote_dict in round_record.get("votes", {}).items():
+            for target, vote_data in vote_dict.items():
+                if target in index:
+                    votes[r, index[voter], index[target]] += vote_data["amount"] if isinstance(vote_data, dict) else vote_data
+
+    return players, votes, submitted
+
+def pairwise_correlation(values: np.ndarray, valid: np.ndarray, min_overlap: int = 3) -> np.ndarray:
+    # Pearson correlation between columns, each pair using only rows where both are valid
+    w = valid.astype(float)
+    x = np.where(valid, values, 0.0)
+    n = w.T @ w
+    sx = x.T @ w
+    sxx = (x * x).T @ w
+    sxy = x.T @ x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sx.T / n
+        var_a = sxx - sx ** 2 / n
+        var_b = var_a.T
+        corr = cov / np.sqrt(var_a * var_b)
+    corr[(n < min_overlap) | ~np.isfinite(corr)] = np.nan
+    return corr
+
+def compute_league_insights(history: list) -> dict:
+    players, votes, submitted = build_vote_arrays(history)
+    n = len(players)
+    matrix = votes.sum(axis=0)
+    given = matrix.sum(axis=1)
+
+    mutual = np.triu(np.minimum(matrix, matrix.T), k=1)
+    pair_order = np.argsort(mutual, axis=None)[::-1]
+    mutual_pairs = [
+        (players[i], players[j], matrix[i, j], matrix[j, i])
+        for i, j in zip(*np.unravel_index(pair_order[:5], mutual.shape))
+        if mutual[i, j] > 0
+    ]
+
+    # generosity: how evenly a voter spreads votes over the people they could vote for
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = matrix / given[:, None]
+        entropy = np.abs(np.nansum(np.where(shares > 0, shares * np.log(shares), 0.0), axis=1))
+        eligible = (submitted.sum(axis=0)[None, :] > 0) & ~np.eye(n, dtype=bool)
+        spread = entropy / np.log(np.maximum(eligible.sum(axis=1), 2))
+    spread[given == 0] = np.nan
+
+    # contrarianism: correlation between a voter's picks and everyone else's, per round and song
+    consensus = votes.sum(axis=1, keepdims=True) - votes
+    mask = submitted[:, None, :] & ~np.eye(n, dtype=bool)[None, :, :] & (votes.sum(axis=2) > 0)[:, :, None]
+    w = mask.astype(float)
+    count = w.sum(axis=(0, 2))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x = (votes * w).sum(axis=(0, 2)) / count
+        mean_y = (consensus * w).sum(axis=(0, 2)) / count
+        dx = (votes - mean_x[None, :, None]) * w
+        dy = (consensus - mean_y[None, :, None]) * w
+        agreement = (dx * dy).sum(axis=(0, 2)) / np.sqrt((dx * dx).sum(axis=(0, 2)) * (dy * dy).sum(axis=(0, 2)))
+    agreement[count < 3] = np.nan
+
+    scores = votes.sum(axis=1)
+    score_corr = pairwise_correlation(scores, submitted)
+    upper = np.where(np.triu(np.ones((n, n), dtype=bool), k=1) & np.isfinite(score_corr), score_corr, -np.inf)
+    corr_order = np.argsort(upper, axis=None)[::-1]
+    correlated_pairs = [
+        (players[i], players[j], score_corr[i, j])
+        for i, j in zip(*np.unravel_index(corr_order[:3], upper.shape))
+        if np.isfinite(upper[i, j])
+    ]
+
+    def ranked(values, reverse):
+        order = [i for i in np.argsort(values) if np.isfinite(values[i])]
+        if reverse:
+            order = order[::-1]
+        return [(players[i], float(values[i])) for i in order[:3]]
+
+    return {
+        "players": players,
+        "matrix": matrix,
+        "rounds": len(history),
+        "mutual_pairs": mutual_pairs,
+        "generous": ranked(spread, reverse=True),
+        "contrarian": ranked(agreement, reverse=False),
+        "correlated_pairs": correlated_pairs
+    }
+
+# one entry per channel, least recently used dropped first
+insights_cache = collections.OrderedDict()
+
+def league_identity(league: dict) -> str:
+    # leagues created before created_at was stored are told apart by their first round
+    history = league.get("history") or [{}]
+    return league.get("created_at") or history[0].get("finished_at") or ""
+
+def search_tokens(text: str) -> set:
+    return set(re.findall(r"\w+", (text or "").lower()))
+
+def submission_doc_key(channel_id: str, player_id: str, submission: dict) -> str:
+    return f"{channel_id}:{player_id}:{submission.get('submitted_at', '')}"
+
+def round_placements(tally: dict) -> dict:
+    results_sorted = sorted(tally.items(), key=lambda x: x[1], reverse=True)
+    return {player_id: rank for rank, (player_id, _) in enumerate(results_sorted, start=1)}
+
+class SearchIndex:
+    # inverted index from title/artist tokens to submission keys, with a sorted
+    # token list so prefix matches are a bisect instead of a scan
+    def __init__(self, path: str):
+        self.path = path
+        self.docs = {}
+        self.postings = {}
+        self.sorted_tokens = []
+        self.loaded = False
+        self.dirty = False
+        self.save_task = None
+        self.version = None
+
+    def load(self, version) -> bool:
+        # False when there is no index on disk or it was saved before the data's latest change
+        lock = FileLock(self.path + ".lock")
+        with lock:
+            if not os.path.exists(self.path):
+                return False
+            with open(self.path, "r") as f:
+                stored = json.load(f)
+        if stored.get("version") != version:
+            return False
+        self.version = version
+        self.docs = stored["docs"]
+        self.postings = {token: set(keys) for token, keys in stored["tokens"].items()}
+        self.sorted_tokens = sorted(self.postings)
+        self.loaded = True
+        return True
+
+    def snapshot(self) -> dict:
+        return {
+            "version": self.version,
+            "docs": {key: dict(doc) for key, doc in self.docs.items()},
+            "tokens": {token: list(keys) for token, keys in self.postings.items()}
+        }
+
+    def write(self, stored: dict):
+        lock = FileLock(self.path + ".lock")
+        with lock:
+            with open(self.path, "w") as f:
+                json.dump(stored, f)
+
+    def save(self):
+        self.write(self.snapshot())
+
+    def flush(self):
+        if self.dirty:
+            self.dirty = False
+            self.save()
+
+    def schedule_save(self, version: int):
+        # a burst of submits or a round change becomes one write, done off the event loop
+        self.version = max(self.version or 0, version)
+        self.dirty = True
+        if self.save_task is None or self.save_task.done():
+            self.save_task = asyncio.get_running_loop().create_task(self.save_later())
+
+    async def save_later(self):
+        while self.dirty:
+            await asyncio.sleep(SEARCH_INDEX_SAVE_DELAY)
+            self.dirty = False
+            stored = self.snapshot()
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.write, stored)
+            except OSError as e:
+                print(f"[Search] Couldn't save the index: {e}")
+
+    def add(self, key: str, doc: dict):
+        self.remove(key)
+        self.docs[key] = doc
+        for token in search_tokens(doc.get("title")) | search_tokens(doc.get("artist")):
+            if token not in self.postings:
+                self.postings[token] = set()
+                bisect.insort(self.sorted_tokens, token)
+            self.postings[token].add(key)
+
+    def remove(self, key: str):
+        doc = self.docs.pop(key, None)
+        if not doc:
+            return
+        for token in search_tokens(doc.get("title")) | search_tokens(doc.get("artist")):
+            keys = self.postings.get(token)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self.postings[token]
+                i = bisect.bisect_left(self.sorted_tokens, token)
+                if i < len(self.sorted_tokens) and self.sorted_tokens[i] == token:
+                    del self.sorted_tokens[i]
+
+    def update(self, key: str, **fields):
+        if key in self.docs:
+            self.docs[key].update(fields)
+
+    def search(self, query: str, limit: int = 10, public_only: bool = False) -> list:
+        scores = None
+        for term in search_tokens(query):
+            # exact token matches outrank prefix matches
+            term_scores = {}
+            i = bisect.bisect_left(self.sorted_tokens, term)
+            while i < len(self.sorted_tokens) and self.sorted_tokens[i].startswith(term):
+                token = self.sorted_tokens[i]
+                weight = 3 if token == term else 1
+                for key in self.postings[token]:
+                    if weight > term_scores.get(key, 0):
+                        term_scores[key] = weight
+                i += 1
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {key: score + term_scores[key] for key, score in scores.items() if key in term_scores}
+            if not scores:
+                return []
+
+        # filtered before the limit, so unfinished submissions can't crowd out archived matches
+        matches = [(key, score) for key, score in (scores or {}).items() if not public_only or self.docs[key].get("public")]
+        ranked = sorted(matches, key=lambda x: (x[1], self.docs[x[0]].get("submitted_at", "")), reverse=True)
+        return [self.docs[key] for key, _ in ranked[:limit]]
+
+    def add_submission(self, channel_id: str, player_id: str, submission: dict, round_num: int, theme: str, public: bool = False):
+        self.add(submission_doc_key(channel_id, player_id, submission), {
+            "title": submission.get("title"),
+            "artist": submission.get("artist"),
+            "url": submission.get("url"),
+            "channel_id": channel_id,
+            "player_id": player_id,
+            "submitted_at": submission.get("submitted_at"),
+            "round": round_num,
+            "theme": theme,
+            "public": public,
+            "placed": False
+        })
+
+    def add_round_record(self, channel_id: str, round_record: dict):
+        tally = round_record.get("tally", {})
+        placements = round_placements(tally)
+        for player_id, submission in round_record.get("submissions", {}).items():
+            self.add_submission(channel_id, player_id, submission, round_record.get("round"), round_record.get("theme"), public=True)
+            self.update(
+                submission_doc_key(channel_id, player_id, submission),
+                placed=True,
+                rank=placements.get(player_id),
+                votes=tally.get(player_id, 0)
+            )
+
+    def rebuild(self, data: dict):
+        self.version = data.get("search_version")
+        self.docs = {}
+        self.postings = {}
+        self.sorted_tokens = []
+        for channel_id, history in data.get("finished_leagues", {}).items():
+            for league in history:
+                for round_record in league.get("history", []):
+                    self.add_round_record(channel_id, round_record)
+        for channel_id, league in data.items():
+            if channel_id == "finished_leagues" or not isinstance(league, dict):
+                continue
+            for round_record in league.get("history", []):
+                self.add_round_record(channel_id, round_record)
+            round_data = league.get("round")
+            if round_data:
+                for player_id, submission in round_data.get("submissions", {}).items():
+                    self.add_submission(channel_id, player_id, submission, league["current_round"], round_data["theme"], public=round_data.get("phase") != "submission")
+        self.loaded = True
+
+search_index = SearchIndex(SEARCH_INDEX_FILE)
+
 def fetch_youtube_info(url: str) -> dict:
     ydl_opts = {"quiet": False, "skip_download": True}
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
@@ -66,10 +501,15 @@ def fetch_youtube_info(url: str) -> dict:
         except Exception:
             return {"title": "Unknown Title", "thumbnail": None, "artist": "Unknown Artist", "explicit": False, "duration": 0, "is_playlist": False, "playlist_warning": None, "video_id": None}
 
+youtube_token = {"value": None, "expires_at": 0}
+
 def get_youtube_access_token() -> str:
     if not all([YOUTUBE_CLIENT_ID, YOUTUBE_CLIENT_SECRET, YOUTUBE_REFRESH_TOKEN]):
         print("[YouTube] Missing credentials (CLIENT_ID, CLIENT_SECRET, or REFRESH_TOKEN)")
         return None
+
+    if youtube_token["value"] and time.monotonic() < youtube_token["expires_at"]:
+        return youtube_token["value"]
     
     try:
         response = requests.post(
@@ -82,14 +522,125 @@ def get_youtube_access_token() -> str:
             }
         )
         if response.status_code == 200:
-            return response.json().get("access_token")
+            payload = response.json()
+            youtube_token["value"] = payload.get("access_token")
+            # refresh a minute early so a token never expires mid-request
+            youtube_token["expires_at"] = time.monotonic() + payload.get("expires_in", 3600) - 60
+            return youtube_token["value"]
         else:
             print(f"[YouTube] Token refresh failed: {response.status_code} - {response.text}")
     except Exception as e:
         print(f"[YouTube] Error refreshing access token: {e}")
     return None
 
+def extract_video_id(url: str) -> str:
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    if host.endswith("youtu.be"):
+        return parsed.path.lstrip("/").split("/")[0] or None
+    if "youtube.com" in host:
+        video_id = parse_qs(parsed.query).get("v", [None])[0]
+        if video_id:
+            return video_id
+        parts = parsed.path.strip("/").split("/")
+        if len(parts) >= 2 and parts[0] in ("shorts", "embed", "live"):
+            return parts[1]
+    return None
+
+def parse_iso_duration(duration: str) -> int:
+    match = re.fullmatch(r"P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?", duration or "")
+    if not match:
+        return 0
+    days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+def fetch_videos_list(video_ids: list) -> dict:
+    access_token = get_youtube_access_token()
+    if not access_token:
+        return {}
+
+    try:
+        response = requests.get(
+            "https://www.googleapis.com/youtube/v3/videos",
+            headers={"Authorization": f"Bearer {access_token}"},
+            params={"part": "snippet,contentDetails", "id": ",".join(video_ids)}
+        )
+        if response.status_code != 200:
+            print(f"[YouTube] videos.list failed: {response.status_code} - {response.text}")
+            return {}
+
+        results = {}
+        for item in response.json().get("items", []):
+            snippet = item.get("snippet", {})
+            details = item.get("contentDetails", {})
+            thumbnails = snippet.get("thumbnails", {})
+            thumbnail = next((thumbnails[size]["url"] for size in ("maxres", "standard", "high", "medium", "default") if size in thumbnails), None)
+            results[item["id"]] = {
+                "title": snippet.get("title", "Unknown Title"),
+                "thumbnail": thumbnail,
+                "artist": snippet.get("channelTitle", "Unknown Artist"),
+                "explicit": details.get("contentRating", {}).get("ytRating") == "ytAgeRestricted",
+                "duration": parse_iso_duration(details.get("duration")),
+                "is_playlist": False,
+                "playlist_warning": None,
+                "video_id": item["id"]
+            }
+        return results
+    except Exception as e:
+        print(f"[YouTube] Error calling videos.list: {e}")
+        return {}
+
+class VideoMetadataBatcher:
+    # collects video IDs for a short window so concurrent lookups share one
+    # videos.list request (up to 50 IDs each) instead of a yt-dlp scrape apiece
+    def __init__(self, window: float = 0.25):
+        self.window = window
+        self.pending = {}
+        self.flush_task = None
+
+    async def get(self, video_id: str) -> dict:
+        future = asyncio.get_running_loop().create_future()
+        self.pending.setdefault(video_id, []).append(future)
+        if len(self.pending) >= 50:
+            asyncio.create_task(self.flush())
+        elif self.flush_task is None:
+            self.flush_task = asyncio.create_task(self.flush_later())
+        return await future
+
+    async def flush_later(self):
+        await asyncio.sleep(self.window)
+        self.flush_task = None
+        await self.flush()
+
+    async def flush(self):
+        batch, self.pending = self.pending, {}
+        video_ids = list(batch)
+        loop = asyncio.get_running_loop()
+        for i in range(0, len(video_ids), 50):
+            chunk = video_ids[i:i + 50]
+            results = await loop.run_in_executor(None, fetch_videos_list, chunk)
+            for video_id in chunk:
+                for future in batch[video_id]:
+                    if not future.done():
+                        future.set_result(results.get(video_id))
+
+video_metadata = VideoMetadataBatcher()
+
+async def lookup_youtube_info(url: str, video_id: str = None) -> dict:
+    video_id = video_id or extract_video_id(url)
+    if video_id:
+        info = await video_metadata.get(video_id)
+        if info:
+            return info
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, fetch_youtube_info, url)
+
 async def create_youtube_playlist(theme: str, channel_id: str, round_num: int) -> dict:
+    # the API calls are blocking, so they run off the event loop
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, create_playlist, theme, channel_id, round_num)
+
+def create_playlist(theme: str, channel_id: str, round_num: int) -> dict:
     access_token = get_youtube_access_token()
     if not access_token:
         return {"success": False, "playlist_id": None, "url": None, "error": "No YouTube credentials"}
@@ -132,7 +683,7 @@ async def create_youtube_playlist(theme: str, channel_id: str, round_num: int) -
         print(f"[YouTube] Error creating playlist: {error_msg}")
         return {"success": False, "playlist_id": None, "url": None, "error": error_msg}
 
-async def add_video_to_playlist(playlist_id: str, video_id: str) -> dict:
+def insert_playlist_item(playlist_id: str, video_id: str, position: int = None) -> dict:
     if not playlist_id or not video_id:
         return {"success": False, "error": "Missing playlist_id or video_id"}
     
@@ -142,24 +693,25 @@ async def add_video_to_playlist(playlist_id: str, video_id: str) -> dict:
     
     try:
         headers = {"Authorization": f"Bearer {access_token}"}
+        snippet = {
+            "playlistId": playlist_id,
+            "resourceId": {
+                "kind": "youtube#video",
+                "videoId": video_id
+            }
+        }
+        if position is not None:
+            snippet["position"] = position
         
         response = requests.post(
             "https://www.googleapis.com/youtube/v3/playlistItems",
             headers=headers,
-            json={
-                "snippet": {
-                    "playlistId": playlist_id,
-                    "resourceId": {
-                        "kind": "youtube#video",
-                        "videoId": video_id
-                    }
-                }
-            },
+            json={"snippet": snippet},
             params={"part": "snippet"}
         )
         
         if response.status_code == 200:
-            return {"success": True}
+            return {"success": True, "item_id": response.json().get("id")}
         else:
             error_msg = f"API returned {response.status_code}: {response.text}"
             print(f"[YouTube] Failed to add video {video_id}: {error_msg}")
@@ -169,12 +721,741 @@ async def add_video_to_playlist(playlist_id: str, video_id: str) -> dict:
         print(f"[YouTube] Error adding video {video_id}: {error_msg}")
         return {"success": False, "error": error_msg}
 
-intents = discord.Intents.default()
-intents.message_content = True
-intents.members = True
-client = discord.Client(intents=intents)
+def list_playlist_items(playlist_id: str) -> list:
+    access_token = get_youtube_access_token()
+    if not access_token:
+        return None
+
+    items = []
+    page_token = None
+    try:
+        while True:
+            params = {"part": "snippet", "playlistId": playlist_id, "maxResults": 50}
+            if page_token:
+                params["pageToken"] = page_token
+            response = requests.get(
+                "https://www.googleapis.com/youtube/v3/playlistItems",
+                headers={"Authorization": f"Bearer {access_token}"},
+                params=params
+            )
+            if response.status_code != 200:
+                print(f"[YouTube] Failed to list playlist {playlist_id}: {response.status_code} - {response.text}")
+                return None
+            payload = response.json()
+            for item in payload.get("items", []):
+                items.append({"item_id": item["id"], "video_id": item["snippet"]["resourceId"]["videoId"]})
+            page_token = payload.get("nextPageToken")
+            if not page_token:
+                return items
+    except Exception as e:
+        print(f"[YouTube] Error listing playlist {playlist_id}: {e}")
+        return None
+
+def delete_playlist_item(item_id: str) -> dict:
+    access_token = get_youtube_access_token()
+    if not access_token:
+        return {"success": False, "error": "No YouTube credentials"}
+
+    try:
+        response = requests.delete(
+            "https://www.googleapis.com/youtube/v3/playlistItems",
+            headers={"Authorization": f"Bearer {access_token}"},
+            params={"id": item_id}
+        )
+        if response.status_code == 204:
+            return {"success": True}
+        error_msg = f"API returned {response.status_code}: {response.text}"
+        print(f"[YouTube] Failed to delete playlist item {item_id}: {error_msg}")
+        return {"success": False, "error": error_msg}
+    except Exception as e:
+        print(f"[YouTube] Error deleting playlist item {item_id}: {e}")
+        return {"success": False, "error": str(e)}
+
+def move_playlist_item(playlist_id: str, item_id: str, video_id: str, position: int) -> dict:
+    access_token = get_youtube_access_token()
+    if not access_token:
+        return {"success": False, "error": "No YouTube credentials"}
+
+    try:
+        response = requests.put(
+            "https://www.googleapis.com/youtube/v3/playlistItems",
+            headers={"Authorization": f"Bearer {access_token}"},
+            json={
+                "id": item_id,
+                "snippet": {
+                    "playlistId": playlist_id,
+                    "resourceId": {"kind": "youtube#video", "videoId": video_id},
+                    "position": position
+                }
+            },
+            params={"part": "snippet"}
+        )
+        if response.status_code == 200:
+            return {"success": True}
+        error_msg = f"API returned {response.status_code}: {response.text}"
+        print(f"[YouTube] Failed to move playlist item {item_id}: {error_msg}")
+        return {"success": False, "error": error_msg}
+    except Exception as e:
+        print(f"[YouTube] Error moving playlist item {item_id}: {e}")
+        return {"success": False, "error": str(e)}
+
+def longest_increasing_run(values: list) -> set:
+    # indexes of one longest strictly increasing subsequence (patience sorting)
+    tails, tail_index, previous = [], [], [None] * len(values)
+    for i, value in enumerate(values):
+        k = bisect.bisect_left(tails, value)
+        if k == len(tails):
+            tails.append(value)
+            tail_index.append(i)
+        else:
+            tails[k] = value
+            tail_index[k] = i
+        previous[i] = tail_index[k - 1] if k > 0 else None
+    keep = set()
+    i = tail_index[-1] if tail_index else None
+    while i is not None:
+        keep.add(i)
+        i = previous[i]
+    return keep
+
+def plan_playlist_changes(current: list, desired: list) -> tuple:
+    # current: [(item_id, video_id)] in playlist order, desired: [video_id] in target order
+    # returns (deletes, steps) with steps as (action, video_id, position, item_id) in execution order
+    available = {}
+    for item_id, video_id in current:
+        available.setdefault(video_id, []).append(item_id)
+    item_for_slot = {}
+    for slot, video_id in enumerate(desired):
+        if available.get(video_id):
+            item_for_slot[slot] = available[video_id].pop(0)
+    slot_for_item = {item_id: slot for slot, item_id in item_for_slot.items()}
+    deletes = [item_id for item_id, _ in current if item_id not in slot_for_item]
+
+    # items already in the right relative order stay put, everything else is
+    # moved (or inserted) right after its predecessor, in target order
+    layout = [slot_for_item[item_id] for item_id, _ in current if item_id in slot_for_item]
+    placed = {layout[i] for i in longest_increasing_run(layout)}
+    steps = []
+    for slot, video_id in enumerate(desired):
+        if slot in placed:
+            continue
+        item_id = item_for_slot.get(slot)
+        if item_id:
+            layout.remove(slot)
+        position = layout.index(slot - 1) + 1 if slot > 0 else 0
+        layout.insert(position, slot)
+        placed.add(slot)
+        steps.append(("move" if item_id else "insert", video_id, position, item_id))
+    return deletes, steps
+
+def reconcile_playlist(playlist_id: str, video_ids: list) -> dict:
+    current = list_playlist_items(playlist_id)
+    if current is None:
+        return {"success": False, "error": "Could not list playlist items"}
+
+    deletes, steps = plan_playlist_changes([(item["item_id"], item["video_id"]) for item in current], video_ids)
+    summary = {"success": True, "inserted": 0, "deleted": 0, "moved": 0, "failed": []}
+    for item_id in deletes:
+        result = delete_playlist_item(item_id)
+        if result["success"]:
+            summary["deleted"] += 1
+        else:
+            summary["failed"].append((item_id, result.get("error", "Unknown error")))
+    for action, video_id, position, item_id in steps:
+        if action == "insert":
+            result = insert_playlist_item(playlist_id, video_id, position)
+        else:
+            result = move_playlist_item(playlist_id, item_id, video_id, position)
+        if result["success"]:
+            summary["inserted" if action == "insert" else "moved"] += 1
+        else:
+            summary["failed"].append((video_id, result.get("error", "Unknown error")))
+
+    print(f"[YouTube] Reconciled playlist {playlist_id}: +{summary['inserted']} -{summary['deleted']} ~{summary['moved']}, {len(summary['failed'])} failed")
+    return summary
+
+if SLIM_MODE:
+    # slash commands only need guild and voice events; member names are fetched on demand
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.voice_states = True
+    client = discord.Client(
+        intents=intents,
+        member_cache_flags=discord.MemberCacheFlags.none(),
+        chunk_guilds_at_startup=False
+    )
+else:
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.members = True
+    client = discord.Client(intents=intents)
 tree = app_commands.CommandTree(client)
 
+display_name_cache = {}
+
+def memory_usage_mb() -> float:
+    # resident set size where /proc is available, otherwise the peak from getrusage
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+async def resolve_display_names(guild: discord.Guild, player_ids) -> dict:
+    names = {}
+    missing = []
+    now = time.monotonic()
+    for pid in set(player_ids):
+        member = guild.get_member(int(pid))
+        if member:
+            names[pid] = member.display_name
+            continue
+        cached = display_name_cache.get((guild.id, pid))
+        if cached and now - cached[1] < DISPLAY_NAME_TTL:
+            names[pid] = cached[0]
+        else:
+            missing.append(pid)
+
+    async def fetch(pid):
+        try:
+            member = await guild.fetch_member(int(pid))
+        except (discord.NotFound, discord.HTTPException):
+            return
+        names[pid] = member.display_name
+        display_name_cache[(guild.id, pid)] = (member.display_name, now)
+
+    if missing:
+        await asyncio.gather(*(fetch(pid) for pid in missing))
+    return names
+
+response_stats = {}
+
+class BudgetedResponse:
+    # stands in for interaction.response: defers once the budget is used up and
+    # turns the handler's first reply into a follow-up after that
+    def __init__(self, interaction, stats: dict, ephemeral: bool):
+        self.original = interaction.response
+        self.interaction = interaction
+        self.stats = stats
+        self.ephemeral = ephemeral
+        self.started = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.auto_deferred = False
+        self.followed_up = False
+        self.handler_replied_after = None
+        self.acknowledged_after = None
+
+    def __getattr__(self, name):
+        return getattr(self.original, name)
+
+    def is_done(self) -> bool:
+        return self.original.is_done()
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def mark_handler_reply(self):
+        if self.handler_replied_after is None:
+            self.handler_replied_after = self.elapsed()
+
+    def mark_acknowledged(self):
+        if self.acknowledged_after is None:
+            self.acknowledged_after = self.elapsed()
+
+    async def auto_defer(self) -> bool:
+        async with self.lock:
+            if self.original.is_done():
+                return False
+            await self.original.defer(ephemeral=self.ephemeral, thinking=True)
+            self.auto_deferred = True
+            self.mark_acknowledged()
+            self.stats["auto_defers"] += 1
+            return True
+
+    async def watchdog(self):
+        await asyncio.sleep(max(RESPONSE_BUDGET - self.elapsed(), 0))
+        await self.auto_defer()
+
+    async def send_message(self, *args, **kwargs):
+        self.mark_handler_reply()
+        async with self.lock:
+            if self.auto_deferred:
+                # the first follow-up replaces the thinking message and inherits its
+                # visibility, so a reply that wants the other visibility drops it first
+                if not self.followed_up and kwargs.get("ephemeral", False) != self.ephemeral:
+                    try:
+                        await self.interaction.delete_original_response()
+                    except discord.HTTPException as e:
+                        print(f"[Deadline] Couldn't remove the thinking message for {self.stats['name']}: {e}")
+                self.followed_up = True
+                return await self.interaction.followup.send(*args, **kwargs)
+            result = await self.original.send_message(*args, **kwargs)
+            self.mark_acknowledged()
+            return result
+
+    async def defer(self, **kwargs):
+        self.mark_handler_reply()
+        async with self.lock:
+            if self.auto_deferred:
+                return
+            await self.original.defer(**kwargs)
+            self.mark_acknowledged()
+
+    def record(self):
+        stats = self.stats
+        stats["calls"] += 1
+        if self.handler_replied_after is not None:
+            if stats["average"] is None:
+                stats["average"] = self.handler_replied_after
+            else:
+                stats["average"] = 0.7 * stats["average"] + 0.3 * self.handler_replied_after
+            stats["slowest"] = max(stats["slowest"], self.handler_replied_after)
+            if self.handler_replied_after >= RESPONSE_BUDGET:
+                stats["near_misses"] += 1
+        if self.acknowledged_after is not None and self.acknowledged_after >= RESPONSE_DEADLINE:
+            stats["misses"] += 1
+            print(f"[Deadline] {stats['name']} was acknowledged after {self.acknowledged_after:.2f}s")
+
+class BudgetedInteraction:
+    def __init__(self, interaction, response: BudgetedResponse):
+        self.interaction = interaction
+        self.response = response
+
+    def __getattr__(self, name):
+        return getattr(self.interaction, name)
+
+def resolve_youtube_stream(submission: dict) -> tuple:
+    ydl_opts = {"quiet": True, "skip_download": True, "format": "bestaudio/best", "noplaylist": True}
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(submission["url"], download=False)
+        if info.get("_type") == "playlist" and info.get("entries"):
+            info = info["entries"][0]
+        return info["url"], True
+
+def resolve_local_track(submission: dict) -> tuple:
+    # LISTENING_PARTY_LOCAL_DIR/<video_id>.<ext>, for testing without YouTube
+    matches = glob.glob(os.path.join(LISTENING_PARTY_LOCAL_DIR, f"{glob.escape(submission.get('video_id') or '')}.*"))
+    if not matches:
+        raise FileNotFoundError(f"No local audio for {submission.get('video_id')}")
+    return matches[0], False
+
+track_resolver = resolve_local_track if LISTENING_PARTY_LOCAL_DIR else resolve_youtube_stream
+party_executor = ThreadPoolExecutor(max_workers=LISTENING_PARTY_WORKERS, thread_name_prefix="listening-party")
+
+class PrebufferedAudio(discord.AudioSource):
+    # reads the first frames up front (on the worker thread) so playback starts instantly
+    def __init__(self, source: discord.AudioSource, frames: int):
+        self.source = source
+        self.buffer = collections.deque()
+        for _ in range(frames):
+            frame = source.read()
+            if not frame:
+                break
+            self.buffer.append(frame)
+
+    def read(self) -> bytes:
+        if self.buffer:
+            return self.buffer.popleft()
+        return self.source.read()
+
+    def is_opus(self) -> bool:
+        return False
+
+    def cleanup(self):
+        self.source.cleanup()
+
+def prepare_track(resolver, submission: dict) -> PrebufferedAudio:
+    location, is_stream = resolver(submission)
+    before_options = "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5" if is_stream else None
+    source = discord.FFmpegPCMAudio(location, before_options=before_options, options="-vn")
+    return PrebufferedAudio(source, PREBUFFER_FRAMES)
+
+def cleanup_prepared_track(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().cleanup()
+
+listening_parties = {}
+
+class ListeningParty:
+    # plays tracks in order, always resolving and buffering the next one while the current one plays
+    def __init__(self, voice_client: discord.VoiceClient, text_channel, tracks: list, resolver=None):
+        self.voice_client = voice_client
+        self.text_channel = text_channel
+        self.tracks = tracks
+        self.resolver = resolver or track_resolver
+        self.loop = asyncio.get_running_loop()
+        self.index = -1
+        self.pending = None
+        self.stopped = False
+
+    def prefetch(self, index: int):
+        if index >= len(self.tracks):
+            return None
+        return self.loop.run_in_executor(party_executor, prepare_track, self.resolver, self.tracks[index][1])
+
+    async def start(self):
+        self.pending = self.prefetch(0)
+        await self.advance_safely()
+
+    async def advance_safely(self):
+        # advance runs from the player thread's callback, where nothing else would see its errors
+        try:
+            await self.advance()
+        except Exception as e:
+            print(f"[Party] Listening party failed: {e}")
+            await self.stop()
+
+    async def advance(self):
+        if self.stopped:
+            return
+        self.index += 1
+        if self.index >= len(self.tracks):
+            await self.text_channel.send("That's every submission! Thanks for listening 🎧")
+            await self.stop()
+            return
+
+        number, submission = self.tracks[self.index]
+        try:
+            source = await self.pending
+        except Exception as e:
+            print(f"[Party] Could not prepare #{number}: {e}")
+            await self.text_channel.send(f"Couldn't play #{number} ({submission.get('title', 'Unknown Title')}), skipping it.")
+            self.pending = self.prefetch(self.index + 1)
+            await self.advance()
+            return
+
+        if self.stopped:
+            source.cleanup()
+            return
+        if not self.voice_client.is_connected():
+            print("[Party] Lost the voice connection, ending the listening party")
+            source.cleanup()
+            await self.stop()
+            return
+        self.pending = self.prefetch(self.index + 1)
+        try:
+            self.voice_client.play(source, after=self.on_track_end)
+        except Exception as e:
+            print(f"[Party] Could not play #{number}: {e}")
+            source.cleanup()
+            await self.stop()
+            await self.text_channel.send("Lost the voice connection, so the listening party is over.")
+            return
+        await self.text_channel.send(f"🎶 Now playing #{number}: **{submission.get('title', 'Unknown Title')}** — {submission.get('artist', 'Unknown Artist')}")
+
+    def on_track_end(self, error):
+        # runs on the voice player thread
+        if error:
+            print(f"[Party] Playback error: {error}")
+        asyncio.run_coroutine_threadsafe(self.advance_safely(), self.loop)
+
+    async def stop(self):
+        if self.stopped:
+            return
+        self.stopped = True
+        listening_parties.pop(self.voice_client.guild.id, None)
+        if self.voice_client.is_playing():
+            self.voice_client.stop()
+        if self.pending is not None:
+            self.pending.add_done_callback(cleanup_prepared_track)
+        try:
+            await self.voice_client.disconnect(force=True)
+        except Exception as e:
+            print(f"[Party] Could not disconnect cleanly: {e}")
+
+profile_session = None
+
+def format_stack(frame) -> str:
+    parts = []
+    while frame is not None:
+        parts.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+class ProfileSession:
+    # profiles the next N invocations of one command (or every invocation for a
+    # while) and watches the event loop for stalls from a background thread
+    def __init__(self, command: str, invocations: int, seconds: int, mode: str):
+        self.command = command
+        self.remaining = None if seconds else invocations
+        self.until = time.monotonic() + seconds if seconds else None
+        self.mode = mode
+        self.started = time.monotonic()
+        self.profile = cProfile.Profile() if mode == "cprofile" else None
+        self.samples = {}
+        self.stalls = []
+        self.active = 0
+        self.calls = 0
+        self.finished = False
+        self.loop_thread = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self.stop_event = threading.Event()
+        self.watcher = threading.Thread(target=self.watch, daemon=True)
+        self.watcher.start()
+        self.beat_task = asyncio.create_task(self.beat())
+
+    def wants(self, command: str) -> bool:
+        return command == self.command and not self.finished
+
+    def enter(self):
+        self.active += 1
+        self.calls += 1
+        if self.profile and self.active == 1:
+            try:
+                self.profile.enable()
+            except ValueError as e:
+                print(f"[Profile] Could not enable cProfile: {e}")
+
+    def exit(self):
+        self.active -= 1
+        if self.profile and self.active == 0:
+            self.profile.disable()
+        if self.remaining is not None:
+            self.remaining -= 1
+            if self.remaining <= 0:
+                self.finish()
+
+    async def beat(self):
+        while not self.finished:
+            self.heartbeat = time.monotonic()
+            if self.until and self.heartbeat >= self.until:
+                self.finish()
+                return
+            await asyncio.sleep(STALL_THRESHOLD / 2)
+
+    def watch(self):
+        stall = None
+        while not self.stop_event.wait(PROFILE_SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.loop_thread)
+            if frame is None:
+                continue
+            if self.mode == "sampling" and self.active:
+                stack = format_stack(frame)
+                self.samples[stack] = self.samples.get(stack, 0) + 1
+
+            lag = time.monotonic() - self.heartbeat
+            if lag > STALL_THRESHOLD and stall is None:
+                stall = {"started": self.heartbeat - self.started, "stack": format_stack(frame), "duration": lag}
+                self.stalls.append(stall)
+            elif stall is not None:
+                if lag > STALL_THRESHOLD:
+                    stall["duration"] = lag
+                else:
+                    stall = None
+
+    def finish(self):
+        global profile_session
+        if self.finished:
+            return
+        self.finished = True
+        self.stop_event.set()
+        if self.profile and self.active:
+            self.profile.disable()
+        if profile_session is self:
+            profile_session = None
+        asyncio.get_running_loop().create_task(self.deliver())
+
+    def report(self) -> str:
+        lines = [
+            f"Profile of /{self.command} ({self.mode})",
+            f"{self.calls} invocation(s) over {time.monotonic() - self.started:.1f}s",
+            "",
+            f"Event loop stalls over {STALL_THRESHOLD * 1000:.0f}ms: {len(self.stalls)}"
+        ]
+        for stall in sorted(self.stalls, key=lambda x: x["duration"], reverse=True)[:10]:
+            lines.append(f"  {stall['duration'] * 1000:.0f}ms at +{stall['started']:.1f}s: {stall['stack']}")
+        lines.append("")
+
+        if self.profile:
+            buffer = io.StringIO()
+            try:
+                pstats.Stats(self.profile, stream=buffer).sort_stats("cumulative").print_stats(60)
+            except TypeError:
+                buffer.write("No profile data collected.\n")
+            lines.append(buffer.getvalue())
+        else:
+            # collapsed stacks, ready for flamegraph.pl or speedscope
+            lines.append(f"Samples every {PROFILE_SAMPLE_INTERVAL * 1000:.0f}ms while /{self.command} was running:")
+            for stack, count in sorted(self.samples.items(), key=lambda x: x[1], reverse=True):
+                lines.append(f"{stack} {count}")
+        return "\n".join(lines)
+
+    async def deliver(self):
+        self.beat_task.cancel()
+        await asyncio.get_running_loop().run_in_executor(None, self.watcher.join)
+        directory = os.path.dirname(os.path.abspath(DATA_FILE))
+        path = os.path.join(directory, f"profile_{self.command.replace(' ', '_')}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.txt")
+        with open(path, "w") as f:
+            f.write(self.report())
+        print(f"[Profile] Wrote {path}")
+        # stack paths and timings are for the bot's owner only, so the report goes by DM
+        try:
+            owner = client.get_user(RESPONSIBLE_PERSON) or await client.fetch_user(RESPONSIBLE_PERSON)
+            await owner.send(f"Profile of `/{self.command}` is done ({self.calls} invocation(s), {len(self.stalls)} stall(s)).", file=discord.File(path))
+        except Exception as e:
+            print(f"[Profile] Could not send report: {e}")
+
+def response_budget(ephemeral: bool = False):
+    # defers up front when a command has been slow lately, otherwise a watchdog
+    # defers when RESPONSE_BUDGET runs out; ephemeral decides how that looks
+    def decorator(func):
+        stats = response_stats.setdefault(func.__name__, {
+            "name": func.__name__,
+            "calls": 0,
+            "average": None,
+            "slowest": 0.0,
+            "auto_defers": 0,
+            "near_misses": 0,
+            "misses": 0
+        })
+
+        @functools.wraps(func)
+        async def wrapper(interaction: discord.Interaction, *args, **kwargs):
+            response = BudgetedResponse(interaction, stats, ephemeral)
+            if stats["average"] is not None and stats["average"] >= RESPONSE_BUDGET:
+                await response.auto_defer()
+            watchdog = asyncio.create_task(response.watchdog())
+            # sessions are keyed by the name users type, e.g. "stats player"
+            command = interaction.command.qualified_name if getattr(interaction, "command", None) else func.__name__
+            session = profile_session if profile_session is not None and profile_session.wants(command) else None
+            if session:
+                session.enter()
+            try:
+                return await func(BudgetedInteraction(interaction, response), *args, **kwargs)
+            finally:
+                watchdog.cancel()
+                response.record()
+                if session:
+                    session.exit()
+        return wrapper
+    return decorator
+
+def format_deadline(deadline: str) -> str:
+    timestamp = int(datetime.fromisoformat(deadline).replace(tzinfo=timezone.utc).timestamp())
+    return f"<t:{timestamp}:f> (<t:{timestamp}:R>)"
+
+class PhaseScheduler:
+    # one task for every league: a min-heap of (deadline, channel_id, phase) entries.
+    # entries are never removed when a round moves on manually, they are checked
+    # against the stored deadline when they come due and dropped if stale.
+    def __init__(self):
+        self.heap = []
+        self.wakeup = asyncio.Event()
+        self.task = None
+        self.firing = set()
+        self.semaphore = asyncio.Semaphore(DEADLINE_CONCURRENCY)
+
+    def schedule(self, channel_id: str, phase: str, deadline: str):
+        entry = (datetime.fromisoformat(deadline), channel_id, phase, deadline)
+        heapq.heappush(self.heap, entry)
+        if self.heap[0] is entry:
+            self.wakeup.set()
+
+    def schedule_round(self, channel_id: str, round_data: dict):
+        if not round_data:
+            return
+        phase = round_data.get("phase")
+        deadline = round_data.get(f"{phase}_deadline")
+        if deadline:
+            self.schedule(channel_id, phase, deadline)
+
+    def rebuild(self, data: dict):
+        self.heap = []
+        for channel_id, league in data.items():
+            if channel_id == "finished_leagues" or not isinstance(league, dict):
+                continue
+            round_data = league.get("round")
+            if round_data:
+                phase = round_data.get("phase")
+                deadline = round_data.get(f"{phase}_deadline")
+                if deadline:
+                    self.heap.append((datetime.fromisoformat(deadline), channel_id, phase, deadline))
+        heapq.heapify(self.heap)
+        self.wakeup.set()
+        print(f"[Scheduler] Loaded {len(self.heap)} pending deadline(s)")
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def run(self):
+        await client.wait_until_ready()
+        while not client.is_closed():
+            self.wakeup.clear()
+            if not self.heap:
+                await self.wakeup.wait()
+                continue
+
+            due, channel_id, phase, deadline = self.heap[0]
+            delay = (due - datetime.utcnow()).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self.heap)
+            # each due deadline gets its own task, so one league's playlist calls and
+            # sends don't hold up every league due after it
+            task = asyncio.create_task(self.fire(channel_id, phase, deadline))
+            self.firing.add(task)
+            task.add_done_callback(self.firing.discard)
+
+    async def fire(self, channel_id: str, phase: str, deadline: str):
+        async with self.semaphore:
+            try:
+                await fire_deadline(channel_id, phase, deadline)
+            except Exception as e:
+                print(f"[Scheduler] Error handling {phase} deadline for {channel_id}: {e}")
+
+phase_scheduler = PhaseScheduler()
+
+async def fire_deadline(channel_id: str, phase: str, deadline: str):
+    data = load_data()
+    league = data.get(channel_id)
+    round_data = league.get("round") if isinstance(league, dict) else None
+    if not round_data or round_data.get("phase") != phase or round_data.get(f"{phase}_deadline") != deadline:
+        return
+
+    channel = client.get_channel(int(channel_id)) or await client.fetch_channel(int(channel_id))
+
+    if phase == "submission":
+        if not round_data["submissions"]:
+            def clear_deadline(data):
+                current = data.get(channel_id)
+                current_round = current.get("round") if isinstance(current, dict) else None
+                if not current_round or current_round.get("submission_deadline") != deadline or current_round["submissions"]:
+                    return "The round changed while the deadline fired."
+                current_round["submission_deadline"] = None
+                return None
+
+            if update_data(clear_deadline) is None:
+                await channel.send("The submission deadline has passed, but there are no submissions to vote on! Use /start_voting once some songs are in.")
+                return
+        error, league, playlist_result = await open_voting(channel_id, deadline)
+        if error is not None:
+            return
+        phase_scheduler.schedule_round(channel_id, league["round"])
+        await channel.send("⏰ The submission deadline has passed!\n" + voting_started_text(league, channel.guild, playlist_result))
+    elif phase == "voting":
+        result = await close_round(channel_id, channel.guild, deadline)
+        if result is None:
+            return
+        embed, discord_file, endembed = result
+        await channel.send("⏰ The voting deadline has passed!", embed=embed, file=discord_file)
+        if endembed:
+            await channel.send(embed=endembed)
+
 class SubmissionsView(View):
     def __init__(self, submissions, theme, requester_id=None, playlist_url=None):
         super().__init__(timeout=180)
@@ -266,12 +1547,226 @@ class SubmissionsView(View):
         await interaction.response.edit_message(embed=self.build_embed(), view=self)
 
 
+def validate_ballot(round_data: dict, player_id: str, ballot: dict, votes_per_player: int):
+    total = 0
+    for target, entry in ballot.items():
+        if target == player_id:
+            return "You cannot vote for yourself."
+        if target not in round_data["submissions"]:
+            return "One of the submissions on your ballot no longer exists."
+        if entry["amount"] < 0:
+            return "Vote amounts cannot be negative."
+        total += entry["amount"]
+    if total > votes_per_player:
+        return f"You have allocated {total} votes, but only have {votes_per_player} this round."
+    return None
+
+class BallotCommentModal(discord.ui.Modal, title="Vote comment"):
+    comment = discord.ui.TextInput(label="Comment", style=discord.TextStyle.paragraph, required=False, max_length=300)
+
+    def __init__(self, ballot_view, target):
+        super().__init__()
+        self.ballot_view = ballot_view
+        self.target = target
+        self.comment.default = ballot_view.ballot.get(target, {}).get("comment")
+
+    async def on_submit(self, interaction: discord.Interaction):
+        entry = self.ballot_view.ballot.get(self.target)
+        if not entry or entry["amount"] == 0:
+            await interaction.response.send_message("Add a vote to this submission before commenting on it.", ephemeral=True)
+            return
+        if self.comment.value:
+            entry["comment"] = self.comment.value
+        else:
+            entry.pop("comment", None)
+        await interaction.response.edit_message(embed=self.ballot_view.build_embed(), view=self.ballot_view)
+
+class BallotView(View):
+    def __init__(self, channel_id, player_id, round_data, votes_per_player):
+        super().__init__(timeout=600)
+        self.channel_id = channel_id
+        self.player_id = player_id
+        self.votes_per_player = votes_per_player
+        self.submission_order = round_data.get("submission_order") or list(round_data["submissions"].keys())
+        self.entries = [
+            (number, pid, round_data["submissions"][pid])
+            for number, pid in enumerate(self.submission_order, start=1)
+            if pid != player_id
+        ]
+        self.page = 0
+        self.max_page = max(len(self.entries) - 1, 0) // SUBS_PER_PAGE
+        self.selected = None
+
+        # stage the player's existing votes so the ballot can be amended; votes for
+        # submissions that were removed since can't be shown, so they are dropped
+        self.ballot = {}
+        for target, vote_data in round_data.get("votes", {}).get(player_id, {}).items():
+            if target not in round_data["submissions"] or target == player_id:
+                continue
+            if isinstance(vote_data, dict):
+                self.ballot[target] = dict(vote_data)
+            else:
+                self.ballot[target] = {"amount": vote_data}
+
+        self.update_components()
+
+    def allocated(self) -> int:
+        return sum(entry["amount"] for entry in self.ballot.values())
+
+    def update_components(self):
+        start = self.page * SUBS_PER_PAGE
+        options = []
+        for number, pid, sub in self.entries[start:start + SUBS_PER_PAGE]:
+            title = sub.get("title", "Unknown Title")
+            label = f"#{number} {title}"
+            if len(label) > 100:
+                label = label[:97] + "..."
+            amount = self.ballot.get(pid, {}).get("amount", 0)
+            options.append(discord.SelectOption(
+                label=label,
+                value=pid,
+                description=f"{sub.get('artist', 'Unknown Artist')[:80]} | {amount} vote(s)",
+                default=pid == self.selected
+            ))
+        self.submission_select.options = options or [discord.SelectOption(label="No submissions", value="none")]
+        self.submission_select.disabled = not options
+
+        remaining = self.votes_per_player - self.allocated()
+        selected_amount = self.ballot.get(self.selected, {}).get("amount", 0)
+        self.remove_vote.disabled = self.selected is None or selected_amount == 0
+        self.add_vote.disabled = self.selected is None or remaining <= 0
+        self.comment_button.disabled = self.selected is None or selected_amount == 0
+        self.prev_page.disabled = self.page == 0
+        self.next_page.disabled = self.page == self.max_page
+
+    def build_embed(self):
+        lines = []
+        for number, pid, sub in self.entries:
+            entry = self.ballot.get(pid)
+            if not entry or (entry["amount"] == 0 and not entry.get("comment")):
+                continue
+            comment = f" | {entry['comment']}" if entry.get("comment") else ""
+            if entry["amount"] == 0:
+                comment += " (add a vote to keep this comment)"
+            lines.append(f"#{number} {sub.get('title', 'Unknown Title')} — **{entry['amount']}**{comment}")
+
+        embed = discord.Embed(
+            title="🗳️ Your ballot",
+            description="\n".join(lines) or "No votes allocated yet. Pick a submission below.",
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text=f"{self.allocated()}/{self.votes_per_player} votes allocated. Nothing is saved until you submit.")
+        return embed
+
+    async def refresh(self, interaction: discord.Interaction):
+        self.update_components()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.select(placeholder="Choose a submission...", row=0)
+    async def submission_select(self, interaction: discord.Interaction, select: Select):
+        self.selected = select.values[0]
+        await self.refresh(interaction)
+
+    @discord.ui.button(label="-1", style=discord.ButtonStyle.secondary, row=1)
+    async def remove_vote(self, interaction: discord.Interaction, button: Button):
+        entry = self.ballot.get(self.selected)
+        if entry and entry["amount"] > 0:
+            entry["amount"] -= 1
+        await self.refresh(interaction)
+
+    @discord.ui.button(label="+1", style=discord.ButtonStyle.secondary, row=1)
+    async def add_vote(self, interaction: discord.Interaction, button: Button):
+        if self.allocated() < self.votes_per_player:
+            self.ballot.setdefault(self.selected, {"amount": 0})["amount"] += 1
+        await self.refresh(interaction)
+
+    @discord.ui.button(label="Comment", style=discord.ButtonStyle.secondary, row=1)
+    async def comment_button(self, interaction: discord.Interaction, button: Button):
+        await interaction.response.send_modal(BallotCommentModal(self, self.selected))
+
+    @discord.ui.button(label="<<< Prev", style=discord.ButtonStyle.secondary, row=2)
+    async def prev_page(self, interaction: discord.Interaction, button: Button):
+        if self.page > 0:
+            self.page -= 1
+        await self.refresh(interaction)
+
+    @discord.ui.button(label=">>> Next", style=discord.ButtonStyle.secondary, row=2)
+    async def next_page(self, interaction: discord.Interaction, button: Button):
+        if self.page < self.max_page:
+            self.page += 1
+        await self.refresh(interaction)
+
+    @discord.ui.button(label="Submit ballot", style=discord.ButtonStyle.success, row=3)
+    async def submit_ballot(self, interaction: discord.Interaction, button: Button):
+        ballot = {target: dict(entry) for target, entry in self.ballot.items() if entry["amount"] > 0}
+        dropped = sum(1 for entry in self.ballot.values() if entry["amount"] == 0 and entry.get("comment"))
+
+        def commit(data):
+            league = data.get(self.channel_id)
+            round_data = league.get("round") if isinstance(league, dict) else None
+            if not round_data or round_data.get("phase") != "voting":
+                return "Voting is no longer open for this round."
+            if (round_data.get("submission_order") or list(round_data["submissions"].keys())) != self.submission_order:
+                return "The submissions changed since you opened this ballot. Please run /ballot again."
+            error = validate_ballot(round_data, self.player_id, ballot, league["votes_per_player"])
+            if error:
+                return error
+            if ballot:
+                round_data.setdefault("votes", {})[self.player_id] = ballot
+            else:
+                # an empty ballot withdraws the player's votes instead of counting as a vote
+                round_data.get("votes", {}).pop(self.player_id, None)
+            return None
+
+        error = update_data(commit)
+        if error:
+            await interaction.response.send_message(error, ephemeral=True)
+            return
+
+        self.stop()
+        embed = self.build_embed()
+        embed.title = "🗳️ Ballot submitted!"
+        dropped_text = f" {dropped} comment(s) on submissions without votes were not saved." if dropped else ""
+        embed.set_footer(text=f"{self.allocated()}/{self.votes_per_player} votes cast.{dropped_text}")
+        await interaction.response.edit_message(embed=embed, view=None)
+
+    @discord.ui.button(label="Clear", style=discord.ButtonStyle.danger, row=3)
+    async def clear_ballot(self, interaction: discord.Interaction, button: Button):
+        self.ballot = {}
+        await self.refresh(interaction)
+
+
 @client.event
 async def on_ready():
+    global stats_cache
     await tree.sync()
     print(f"Logged in as {client.user}")
+    cached_members = sum(len(guild.members) for guild in client.guilds)
+    print(f"Ready after {time.monotonic() - STARTED_AT:.1f}s with {cached_members} cached members, {memory_usage_mb():.1f} MiB resident (slim mode: {SLIM_MODE})")
     if not hasattr(client, "listening_task"):
         client.listening_task = asyncio.create_task(update_listening_status())
+    data = load_data()
+    phase_scheduler.rebuild(data)
+    phase_scheduler.start()
+    if not search_index.loaded and not search_index.load(data.get("search_version")):
+        # no index on disk yet, it was deleted to force a rebuild, or the bot stopped
+        # before a delayed save went out
+        search_index.rebuild(data)
+        search_index.save()
+    if not os.path.exists(STATS_FILE):
+        # first run with statistics: count the leagues that were already archived
+        stats_cache = rebuild_stats(data)
+        save_stats(stats_cache)
+
+@client.event
+async def on_voice_state_update(member, before, after):
+    # the bot was kicked or moved out of voice, so any party in that guild is over
+    if member.id != client.user.id or before.channel is None or after.channel is not None:
+        return
+    party = listening_parties.get(member.guild.id)
+    if party:
+        await party.stop()
+        await party.text_channel.send("Lost the voice connection, so the listening party is over.")
 
 async def update_listening_status():
     await client.wait_until_ready()
@@ -296,6 +1791,7 @@ async def update_listening_status():
 
 @tree.command(description="Create a new league in this channel")
 @app_commands.describe(rounds="Number of rounds in this league", votes_per_player="Number of votes each player can cast per round", max_players="Maximum number of players (0 = unlimited)")
+@response_budget()
 async def create_league(interaction: discord.Interaction, rounds: int, votes_per_player: int, max_players: int = 15):
     data = load_data()
     channel_id = str(interaction.channel_id)
@@ -323,7 +1819,8 @@ async def create_league(interaction: discord.Interaction, rounds: int, votes_per
         "max_rounds": rounds,
         "scores": {},
         "votes_per_player": votes_per_player,
-        "max_players": max_players
+        "max_players": max_players,
+        "created_at": datetime.utcnow().isoformat()
     }
     save_data(data)
 
@@ -331,6 +1828,7 @@ async def create_league(interaction: discord.Interaction, rounds: int, votes_per
     await interaction.response.send_message(f"New league created in this channel!{max_text}")
 
 @tree.command(description="Join the league in this channel")
+@response_budget()
 async def join_league(interaction: discord.Interaction):
     data = load_data()
     channel_id = str(interaction.channel_id)
@@ -358,8 +1856,9 @@ async def join_league(interaction: discord.Interaction):
     await interaction.response.send_message(f"{interaction.user.mention} joined the league! ({current_players + 1}/{max_players if max_players > 0 else '∞'})")
 
 @tree.command(description="Start a new round")
-@app_commands.describe(theme="Theme for this round")
-async def start_round(interaction: discord.Interaction, theme: str):
+@app_commands.describe(theme="Theme for this round", submission_hours="Automatically start voting after this many hours (optional)", voting_hours="Automatically end the round this many hours after voting starts (optional)")
+@response_budget()
+async def start_round(interaction: discord.Interaction, theme: str, submission_hours: float = None, voting_hours: float = None):
     data = load_data()
     channel_id = str(interaction.channel_id)
 
@@ -380,6 +1879,14 @@ async def start_round(interaction: discord.Interaction, theme: str):
         await interaction.response.send_message("The league has already completed all its rounds.", ephemeral=True)
         return
 
+    if (submission_hours is not None and submission_hours <= 0) or (voting_hours is not None and voting_hours <= 0):
+        await interaction.response.send_message("Deadlines must be a positive number of hours.", ephemeral=True)
+        return
+
+    submission_deadline = None
+    if submission_hours:
+        submission_deadline = (datetime.utcnow() + timedelta(hours=submission_hours)).isoformat()
+
     league["current_round"] += 1
     league["round"] = {
         "theme": theme,
@@ -387,18 +1894,26 @@ async def start_round(interaction: discord.Interaction, theme: str):
         "votes": {},
         "phase": "submission",
         "submissions_message_id": None,
-        "submission_order": []
+        "submission_order": [],
+        "submission_deadline": submission_deadline,
+        "voting_hours": voting_hours
     }
     save_data(data)
+    phase_scheduler.schedule_round(channel_id, league["round"])
 
     role = interaction.guild.get_role(PLAYER_ROLE)
+
+    deadline_text = ""
+    if submission_deadline:
+        deadline_text = f"\nSubmissions close {format_deadline(submission_deadline)}."
     
     await interaction.response.send_message(
         f"**Round {league['current_round']}/{league['max_rounds']} started!** {role.mention}\n"
-        f"**Theme:** {theme}\nUse `/submit <url>` to enter your song."
+        f"**Theme:** {theme}\nUse `/submit <url>` to enter your song.{deadline_text}"
     )
 @tree.command(description="Submit your song for the current round")
 @app_commands.describe(url="YouTube or YouTube Music link", content_warning="Content/trigger warning(s) (optional)")
+@response_budget(ephemeral=True)
 async def submit(interaction: discord.Interaction, url: str, content_warning: str = None):
     data = load_data()
     channel_id = str(interaction.channel_id)
@@ -423,8 +1938,7 @@ async def submit(interaction: discord.Interaction, url: str, content_warning: st
 
     await interaction.response.defer(thinking=True, ephemeral=True)
 
-    loop = asyncio.get_running_loop()
-    yt_info = await loop.run_in_executor(None, fetch_youtube_info, url)
+    yt_info = await lookup_youtube_info(url)
     title = yt_info["title"]
     thumbnail = yt_info["thumbnail"]
     artist = yt_info["artist"]
@@ -432,8 +1946,7 @@ async def submit(interaction: discord.Interaction, url: str, content_warning: st
     playlist_warning = yt_info.get("playlist_warning")
     video_id = yt_info.get("video_id")
 
-    data = load_data()
-    data[channel_id]["round"]["submissions"][str(interaction.user.id)] = {
+    submission = {
         "url": url,
         "title": title,
         "thumbnail": thumbnail,
@@ -443,7 +1956,34 @@ async def submit(interaction: discord.Interaction, url: str, content_warning: st
         "submitted_at": datetime.utcnow().isoformat(),
         "video_id": video_id
     }
-    save_data(data)
+    saved = {}
+
+    # the lookup above can take a while, so the phase is checked again inside the lock
+    def commit(data):
+        league = data.get(channel_id)
+        round_data = league.get("round") if isinstance(league, dict) else None
+        if not round_data:
+            return "The round ended before your submission was saved."
+        if round_data.get("phase") != "submission":
+            return "Voting started before your submission was saved, so it was not added."
+        if player_id not in league["players"]:
+            return "You are not part of this league. Use /join_league first."
+        saved["previous"] = round_data["submissions"].get(player_id)
+        saved["round"] = league["current_round"]
+        saved["theme"] = round_data["theme"]
+        saved["version"] = bump_search_version(data)
+        round_data["submissions"][player_id] = submission
+        return None
+
+    error = update_data(commit)
+    if error is not None:
+        await interaction.edit_original_response(content=error)
+        return
+
+    if saved["previous"]:
+        search_index.remove(submission_doc_key(channel_id, player_id, saved["previous"]))
+    search_index.add_submission(channel_id, player_id, submission, saved["round"], saved["theme"])
+    search_index.schedule_save(saved["version"])
 
     explicit_marker = "[E] " if explicit else ""
     cw_marker = f" | CW: {content_warning}" if content_warning else ""
@@ -455,6 +1995,7 @@ async def submit(interaction: discord.Interaction, url: str, content_warning: st
     await interaction.edit_original_response(content=response_text)
 
 @tree.command(description="Show all submissions for the current round")
+@response_budget()
 async def show_submissions(interaction: discord.Interaction):
     data = load_data()
     channel_id = str(interaction.channel_id)
@@ -494,7 +2035,8 @@ async def show_submissions(interaction: discord.Interaction):
 
 
 @tree.command(description="Show details for a specific submission")
-@app_commands.describe(number="The submission number")
+@app_commands.describe(number="The submission number (start typing a title to search)")
+@response_budget()
 async def submission_details(interaction: discord.Interaction, number: int):
     data = load_data()
     channel_id = str(interaction.channel_id)
@@ -536,7 +2078,118 @@ async def submission_details(interaction: discord.Interaction, number: int):
     await interaction.response.send_message(embed=embed)
 
 
+def round_video_ids(round_data: dict) -> list:
+    submission_order = round_data.get("submission_order") or list(round_data["submissions"].keys())
+    video_ids = []
+    for player_id in submission_order:
+        video_id = round_data["submissions"].get(player_id, {}).get("video_id")
+        if video_id:
+            video_ids.append(video_id)
+    return video_ids
+
+async def sync_round_playlist(round_data: dict) -> dict:
+    loop = asyncio.get_running_loop()
+    summary = await loop.run_in_executor(None, reconcile_playlist, round_data["playlist_id"], round_video_ids(round_data))
+    if summary.get("failed"):
+        print(f"[YouTube] {len(summary['failed'])} playlist change(s) failed:")
+        for vid_id, error in summary["failed"]:
+            print(f"  - {vid_id}: {error}")
+    return summary
+
+def attach_playlist(channel_id: str, round_number: int, playlist_result: dict):
+    # only the playlist fields are written, and only while the same round is still voting
+    attached = {}
+
+    def commit(data):
+        league = data.get(channel_id)
+        round_data = league.get("round") if isinstance(league, dict) else None
+        if not round_data or league.get("current_round") != round_number or round_data.get("phase") != "voting":
+            return "The round ended before the playlist was ready."
+        round_data["playlist_id"] = playlist_result["playlist_id"]
+        round_data["playlist_url"] = playlist_result["url"]
+        attached["round"] = round_data
+        return None
+
+    update_data(commit)
+    return attached.get("round")
+
+async def open_voting(channel_id: str, submission_deadline: str = None) -> tuple:
+    # the phase change is written before any playlist call is awaited, so submissions
+    # and votes that land while YouTube is busy are never overwritten by a stale copy
+    opened = {}
+
+    def commit(data):
+        league = data.get(channel_id)
+        round_data = league.get("round") if isinstance(league, dict) else None
+        if not round_data:
+            return "No active round in this channel."
+        if round_data.get("phase") != "submission":
+            return "You can only start voting from the submission phase."
+        if submission_deadline is not None and round_data.get("submission_deadline") != submission_deadline:
+            return "The submission deadline has moved."
+        if not round_data["submissions"]:
+            return "No submissions to vote on!"
+
+        round_data["phase"] = "voting"
+        if round_data.get("voting_hours"):
+            round_data["voting_deadline"] = (datetime.utcnow() + timedelta(hours=round_data["voting_hours"])).isoformat()
+
+        #randomize submission order once for now
+        submission_ids = list(round_data["submissions"].keys())
+        random.shuffle(submission_ids)
+        round_data["submission_order"] = submission_ids
+        opened["league"] = league
+        opened["version"] = bump_search_version(data)
+        return None
+
+    error = update_data(commit)
+    if error is not None:
+        return error, None, None
+
+    league = opened["league"]
+    round_data = league["round"]
+    invalidate_round_choices(channel_id)
+
+    for player_id in round_data["submission_order"]:
+        search_index.update(submission_doc_key(channel_id, player_id, round_data["submissions"][player_id]), public=True)
+    search_index.schedule_save(opened["version"])
+
+    # Try to create YouTube playlist
+    playlist_result = await create_youtube_playlist(
+        round_data["theme"],
+        channel_id,
+        league["current_round"]
+    )
+
+    if playlist_result["success"]:
+        round_data["playlist_id"] = playlist_result["playlist_id"]
+        round_data["playlist_url"] = playlist_result["url"]
+
+        # Add videos to playlist, using the round as it is now rather than when voting opened
+        current_round = attach_playlist(channel_id, league["current_round"], playlist_result)
+        if current_round is not None:
+            await sync_round_playlist(current_round)
+
+    return None, league, playlist_result
+
+def voting_started_text(league: dict, guild: discord.Guild, playlist_result: dict) -> str:
+    role = guild.get_role(PLAYER_ROLE)
+
+    playlist_text = ""
+    if playlist_result["success"]:
+        playlist_text = f"\nListen to the playlist here! ({playlist_result['url']})"
+
+    deadline_text = ""
+    if league["round"].get("voting_deadline"):
+        deadline_text = f"\nVoting closes {format_deadline(league['round']['voting_deadline'])}."
+
+    return (
+        f"Voting phase started! Use /show_submissions to view and /vote to vote.\n"
+        f"Total votes per player: {league['votes_per_player']}{deadline_text}\n\n{role.mention}{playlist_text}"
+    )
+
 @tree.command(description="Move the current round to voting phase")
+@response_budget()
 async def start_voting(interaction: discord.Interaction):
     data = load_data()
     channel_id = str(interaction.channel_id)
@@ -558,56 +2211,60 @@ async def start_voting(interaction: discord.Interaction):
         await interaction.response.send_message("No submissions to vote on!", ephemeral=True)
         return
 
-    votes_per_player = data[channel_id]["votes_per_player"]
-    round_data["phase"] = "voting"
-    
-    #randomize submission order once for now
-    submission_ids = list(round_data["submissions"].keys())
-    random.shuffle(submission_ids)
-    round_data["submission_order"] = submission_ids
-    
-    # Try to create YouTube playlist
-    league = data[channel_id]
-    playlist_result = await create_youtube_playlist(
-        round_data["theme"],
-        channel_id,
-        league["current_round"]
-    )
-    
-    if playlist_result["success"]:
-        round_data["playlist_id"] = playlist_result["playlist_id"]
-        round_data["playlist_url"] = playlist_result["url"]
-        
-        # Add videos to playlist
-        failed_videos = []
-        for player_id in submission_ids:
-            submission = round_data["submissions"][player_id]
-            video_id = submission.get("video_id")
-            if video_id:
-                add_result = await add_video_to_playlist(playlist_result["playlist_id"], video_id)
-                if not add_result["success"]:
-                    failed_videos.append((video_id, add_result.get("error", "Unknown error")))
-        
-        if failed_videos:
-            print(f"[YouTube] {len(failed_videos)} video(s) failed to add to playlist:")
-            for vid_id, error in failed_videos:
-                print(f"  - {vid_id}: {error}")
-    
-    save_data(data)
-    
-    role = interaction.guild.get_role(PLAYER_ROLE)
-    
-    playlist_text = ""
-    if playlist_result["success"]:
-        playlist_text = f"\nListen to the playlist here! ({playlist_result['url']})"
-    
-    await interaction.response.send_message(
-        f"Voting phase started! Use /show_submissions to view and /vote to vote.\n"
-        f"Total votes per player: {votes_per_player}\n\n{role.mention}{playlist_text}"
+    error, league, playlist_result = await open_voting(channel_id)
+    if error is not None:
+        await interaction.response.send_message(error, ephemeral=True)
+        return
+    phase_scheduler.schedule_round(channel_id, league["round"])
+
+    await interaction.response.send_message(voting_started_text(league, interaction.guild, playlist_result))
+
+@tree.command(description="Bring this round's YouTube playlist in line with its submissions")
+@response_budget()
+async def sync_playlist(interaction: discord.Interaction):
+    data = load_data()
+    channel_id = str(interaction.channel_id)
+
+    if (interaction.user.guild_permissions.manage_messages == False) and (interaction.user.id != RESPONSIBLE_PERSON):
+        await interaction.response.send_message("Only users with permission can sync the playlist.", ephemeral=True)
+        return
+
+    if channel_id not in data or data[channel_id]["round"] is None:
+        await interaction.response.send_message("No active round in this channel.", ephemeral=True)
+        return
+
+    round_data = data[channel_id]["round"]
+    if round_data.get("phase") != "voting":
+        await interaction.response.send_message("The playlist is only built once voting has started.", ephemeral=True)
+        return
+
+    await interaction.response.defer(thinking=True)
+
+    if not round_data.get("playlist_id"):
+        playlist_result = await create_youtube_playlist(round_data["theme"], channel_id, data[channel_id]["current_round"])
+        if not playlist_result["success"]:
+            await interaction.followup.send(f"Couldn't create a playlist: {playlist_result['error']}")
+            return
+        round_data = attach_playlist(channel_id, data[channel_id]["current_round"], playlist_result)
+        if round_data is None:
+            await interaction.followup.send("The round ended before the playlist was ready.")
+            return
+
+    summary = await sync_round_playlist(round_data)
+    if not summary["success"]:
+        await interaction.followup.send(f"Couldn't sync the playlist: {summary['error']}")
+        return
+
+    changes = summary["inserted"] + summary["deleted"] + summary["moved"]
+    failed_text = f" ({len(summary['failed'])} failed, check the logs)" if summary["failed"] else ""
+    await interaction.followup.send(
+        f"Playlist synced with {changes} change{'s' if changes != 1 else ''}: "
+        f"{summary['inserted']} added, {summary['deleted']} removed, {summary['moved']} moved{failed_text}.\n{round_data['playlist_url']}"
     )
 
 @tree.command(description=f"Vote for a submission (you have multiple votes per round)")
-@app_commands.describe(number="The submission number you want to vote for", amount="The number of votes to allocate to this submission", comment="Optional comment about your vote")
+@app_commands.describe(number="The submission number you want to vote for (start typing a title to search)", amount="The number of votes to allocate to this submission", comment="Optional comment about your vote")
+@response_budget()
 async def vote(interaction: discord.Interaction, number: int, amount: int = 1, comment: str = None):
     data = load_data()
     channel_id = str(interaction.channel_id)
@@ -675,29 +2332,139 @@ async def vote(interaction: discord.Interaction, number: int, amount: int = 1, c
     comment_text = f" | Comment: {comment}" if comment else ""
     await interaction.response.send_message(f"You gave {amount} vote(s) to submission #{number}. You have {remaining} votes left this round.{comment_text}")
 
-@tree.command(description="End the round and show results")
-async def end_round(interaction: discord.Interaction):
+round_choices = {}
+
+def round_choice_entries(channel_id: str) -> list:
+    # built from disk once per voting phase, then served from memory on every keystroke;
+    # nothing is cached outside voting, so a keystroke racing the phase change can't pin []
+    entries = round_choices.get(channel_id)
+    if entries is None:
+        data = load_data()
+        league = data.get(channel_id)
+        round_data = league.get("round") if isinstance(league, dict) else None
+        entries = []
+        if round_data and round_data.get("phase") == "voting":
+            submission_order = round_data.get("submission_order") or list(round_data["submissions"].keys())
+            for number, pid in enumerate(submission_order, start=1):
+                sub = round_data["submissions"].get(pid)
+                if not sub:
+                    continue
+                title = sub.get("title", "Unknown Title")
+                artist = sub.get("artist", "Unknown Artist")
+                label = f"#{number} {title} — {artist}"
+                if len(label) > 100:
+                    label = label[:97] + "..."
+                entries.append((number, label, f"{number} {title} {artist}".lower()))
+            round_choices[channel_id] = entries
+    return entries
+
+def invalidate_round_choices(channel_id: str):
+    round_choices.pop(channel_id, None)
+
+@vote.autocomplete("number")
+@submission_details.autocomplete("number")
+async def submission_number_autocomplete(interaction: discord.Interaction, current: str) -> list:
+    current = current.lower().strip().lstrip("#")
+    choices = []
+    for number, label, text in round_choice_entries(str(interaction.channel_id)):
+        if current and current not in text:
+            continue
+        choices.append(app_commands.Choice(name=label, value=number))
+        if len(choices) == 25:
+            break
+    return choices
+
+@tree.command(description="Open your ballot to allocate all of your votes at once")
+@response_budget(ephemeral=True)
+async def ballot(interaction: discord.Interaction):
     data = load_data()
     channel_id = str(interaction.channel_id)
-
-    if (interaction.user.guild_permissions.manage_messages == False) and (interaction.user.id != RESPONSIBLE_PERSON):
-        await interaction.response.send_message("Only users with permission can end the round.", ephemeral=True)
-        return
+    player_id = str(interaction.user.id)
 
     if channel_id not in data or data[channel_id]["round"] is None:
         await interaction.response.send_message("No active round in this channel.", ephemeral=True)
         return
 
-    league = data[channel_id]
-    round_data = league["round"]
-    votes = round_data["votes"]
-    submissions = round_data["submissions"]
-    tally = {}
+    round_data = data[channel_id]["round"]
+    if round_data.get("phase") != "voting":
+        await interaction.response.send_message("Voting is only allowed during the voting phase.", ephemeral=True)
+        return
 
-    for voter, vote_dict in votes.items():
-        for target, vote_data in vote_dict.items():
-            amount = vote_data["amount"] if isinstance(vote_data, dict) else vote_data
-            tally[target] = tally.get(target, 0) + amount
+    view = BallotView(channel_id, player_id, round_data, data[channel_id]["votes_per_player"])
+    await interaction.response.send_message(embed=view.build_embed(), view=view, ephemeral=True)
+
+async def close_round(channel_id: str, guild: discord.Guild, voting_deadline: str = None):
+    # display names are fetched first; the tally is taken from a fresh read inside the
+    # lock, so votes cast while the names were being looked up still count
+    data = load_data()
+    league = data.get(channel_id)
+    if not isinstance(league, dict) or league.get("round") is None:
+        return None
+    names = await resolve_display_names(guild, set(league["round"]["submissions"]) | set(league["scores"]))
+
+    closed = {}
+
+    def commit(data):
+        league = data.get(channel_id)
+        round_data = league.get("round") if isinstance(league, dict) else None
+        if not round_data:
+            return "No active round in this channel."
+        if voting_deadline is not None and (round_data.get("phase") != "voting" or round_data.get("voting_deadline") != voting_deadline):
+            return "The voting deadline has moved."
+
+        votes = round_data["votes"]
+        tally = {}
+        for voter, vote_dict in votes.items():
+            for target, vote_data in vote_dict.items():
+                amount = vote_data["amount"] if isinstance(vote_data, dict) else vote_data
+                tally[target] = tally.get(target, 0) + amount
+
+        for player_id, count in tally.items():
+            league["scores"][player_id] = league["scores"].get(player_id, 0) + count
+
+        round_record = {
+            "round": league["current_round"],
+            "theme": round_data["theme"],
+            "finished_at": datetime.utcnow().isoformat(),
+            "submissions": round_data["submissions"],
+            "submission_order": round_data.get("submission_order", []),
+            "votes": votes,
+            "tally": tally
+        }
+        league.setdefault("history", []).append(round_record)
+        league["round"] = None
+
+        if league["current_round"] >= league["max_rounds"]:
+            finished = data.get("finished_leagues", {})
+            channel_history = finished.get(channel_id, [])
+
+            archive_entry = league.copy()
+            archive_entry["finished_at"] = datetime.utcnow().isoformat()
+
+            channel_history.append(archive_entry)
+            finished[channel_id] = channel_history
+            data["finished_leagues"] = finished
+
+            del data[channel_id]
+
+        closed["league"] = league
+        closed["record"] = round_record
+        closed["version"] = bump_search_version(data)
+        return None
+
+    if update_data(commit) is not None:
+        return None
+
+    league = closed["league"]
+    round_record = closed["record"]
+    submissions = round_record["submissions"]
+    tally = round_record["tally"]
+
+    stats = get_stats()
+    record_round_stats(stats, round_record)
+    search_index.add_round_record(channel_id, round_record)
+    search_index.schedule_save(closed["version"])
+    invalidate_round_choices(channel_id)
 
     results_sorted = sorted(tally.items(), key=lambda x: x[1], reverse=True)
     full_results_lines = ["Rank,Submitter,Song Title,Artist,Explicit,Votes,URL\n"]
@@ -706,8 +2473,7 @@ async def end_round(interaction: discord.Interaction):
     top_results_for_embed = []
     
     for rank, (player_id, count) in enumerate(results_sorted, start=1):
-        member = interaction.guild.get_member(int(player_id))
-        name = member.display_name if member else f"User {player_id}"
+        name = names.get(player_id, f"User {player_id}")
         
         submission = submissions.get(player_id, {})
         title = submission.get("title", "Unknown Title").replace(",", "") 
@@ -728,12 +2494,9 @@ async def end_round(interaction: discord.Interaction):
 
     del full_results_lines
     del results_content
-
-    for player_id, count in tally.items():
-        league["scores"][player_id] = league["scores"].get(player_id, 0) + count
     
     embed = discord.Embed(
-        title=f"🎶 Final Tally for Round {league['current_round']} ({round_data['theme']})",
+        title=f"🎶 Final Tally for Round {league['current_round']} ({round_record['theme']})",
         description="The top 5 submissions are below. Find the full results attached!",
         color=discord.Color.red()
     )
@@ -751,21 +2514,21 @@ async def end_round(interaction: discord.Interaction):
     
     standings = sorted(league["scores"].items(), key=lambda x: x[1], reverse=True)
     standings_text = "\n".join(
-        f"{interaction.guild.get_member(int(pid)).display_name if interaction.guild.get_member(int(pid)) else pid}: {pts} pts"
+        f"{names.get(pid, pid)}: {pts} pts"
         for pid, pts in standings
     )
     embed.add_field(name="\n\nCurrent League Standings", value=standings_text or "No points yet", inline=False)
 
 
     endembed = None
-    league["round"] = None 
 
     if league["current_round"] >= league["max_rounds"]:
         top_score = standings[0][1] if standings else 0
         winners = [pid for pid, pts in standings if pts == top_score]
+        record_league_stats(stats, league, winners)
 
         winner_names = ", ".join(
-            interaction.guild.get_member(int(pid)).display_name if interaction.guild.get_member(int(pid)) else pid
+            names.get(pid, pid)
             for pid in winners
         )
 
@@ -780,24 +2543,116 @@ async def end_round(interaction: discord.Interaction):
             inline=False
         )
 
-        finished = data.get("finished_leagues", {})
-        channel_history = finished.get(channel_id, [])
-        
-        archive_entry = league.copy()
-        archive_entry["finished_at"] = datetime.utcnow().isoformat()
+    save_stats(stats)
+    return embed, discord_file, endembed
 
-        channel_history.append(archive_entry)
-        finished[channel_id] = channel_history
-        data["finished_leagues"] = finished
+@tree.command(description="End the round and show results")
+@response_budget()
+async def end_round(interaction: discord.Interaction):
+    data = load_data()
+    channel_id = str(interaction.channel_id)
 
-        del data[channel_id]
+    if (interaction.user.guild_permissions.manage_messages == False) and (interaction.user.id != RESPONSIBLE_PERSON):
+        await interaction.response.send_message("Only users with permission can end the round.", ephemeral=True)
+        return
 
-    save_data(data)
+    if channel_id not in data or data[channel_id]["round"] is None:
+        await interaction.response.send_message("No active round in this channel.", ephemeral=True)
+        return
+
+    result = await close_round(channel_id, interaction.guild)
+    if result is None:
+        await interaction.response.send_message("No active round in this channel.", ephemeral=True)
+        return
+    embed, discord_file, endembed = result
     await interaction.response.send_message(embed=embed, file=discord_file)
     if endembed:
         await interaction.channel.send(embed=endembed)
 
+@tree.command(description="Play this round's submissions in your voice channel")
+@response_budget()
+async def listening_party(interaction: discord.Interaction):
+    data = load_data()
+    channel_id = str(interaction.channel_id)
+
+    if (interaction.user.guild_permissions.manage_messages == False) and (interaction.user.id != RESPONSIBLE_PERSON):
+        await interaction.response.send_message("Only users with permission can start a listening party.", ephemeral=True)
+        return
+
+    if channel_id not in data or data[channel_id]["round"] is None:
+        await interaction.response.send_message("No active round in this channel.", ephemeral=True)
+        return
+
+    round_data = data[channel_id]["round"]
+    if round_data.get("phase") != "voting":
+        await interaction.response.send_message("Listening parties can only happen during the voting phase.", ephemeral=True)
+        return
+
+    voice = interaction.user.voice
+    if not voice or not voice.channel:
+        await interaction.response.send_message("Join a voice channel first!", ephemeral=True)
+        return
+
+    if interaction.guild.id in listening_parties:
+        await interaction.response.send_message("A listening party is already running in this server.", ephemeral=True)
+        return
+    # hold the slot while connecting, so a second call can't connect as well
+    listening_parties[interaction.guild.id] = None
+
+    submission_order = round_data.get("submission_order") or list(round_data["submissions"].keys())
+    tracks = [
+        (number, round_data["submissions"][pid])
+        for number, pid in enumerate(submission_order, start=1)
+        if pid in round_data["submissions"]
+    ]
+
+    try:
+        await interaction.response.defer(thinking=True)
+        voice_client = await voice.channel.connect()
+    except Exception as e:
+        listening_parties.pop(interaction.guild.id, None)
+        if not interaction.response.is_done():
+            raise
+        await interaction.followup.send(f"Couldn't join {voice.channel.mention}: {e}")
+        return
+
+    party = ListeningParty(voice_client, interaction.channel, tracks)
+    listening_parties[interaction.guild.id] = party
+    await interaction.followup.send(f"🎧 Listening party in {voice.channel.mention}! Playing {len(tracks)} submission{'s' if len(tracks) != 1 else ''} in order.")
+    await party.start()
+
+@tree.command(description="Skip the current song in the listening party")
+@response_budget()
+async def listening_party_skip(interaction: discord.Interaction):
+    party = listening_parties.get(interaction.guild.id)
+    if not party:
+        await interaction.response.send_message("No listening party is running.", ephemeral=True)
+        return
+
+    if (interaction.user.guild_permissions.manage_messages == False) and (interaction.user.id != RESPONSIBLE_PERSON):
+        await interaction.response.send_message("Only users with permission can skip songs.", ephemeral=True)
+        return
+
+    party.voice_client.stop()
+    await interaction.response.send_message("Skipped!")
+
+@tree.command(description="End the listening party")
+@response_budget()
+async def listening_party_stop(interaction: discord.Interaction):
+    party = listening_parties.get(interaction.guild.id)
+    if not party:
+        await interaction.response.send_message("No listening party is running.", ephemeral=True)
+        return
+
+    if (interaction.user.guild_permissions.manage_messages == False) and (interaction.user.id != RESPONSIBLE_PERSON):
+        await interaction.response.send_message("Only users with permission can stop the listening party.", ephemeral=True)
+        return
+
+    await party.stop()
+    await interaction.response.send_message("Listening party over, thanks for coming! 🎶")
+
 @tree.command(description="Check if all players have submitted a song for the current round")
+@response_budget(ephemeral=True)
 async def check_submissions(interaction: discord.Interaction):
     data = load_data()
     channel_id = str(interaction.channel_id)
@@ -823,6 +2678,7 @@ async def check_submissions(interaction: discord.Interaction):
         await interaction.response.send_message(f"Waiting on submissions from: {', '.join(mentions)}", ephemeral=True)
 
 @tree.command(description="Check who hasn't voted yet in the current round.")
+@response_budget(ephemeral=True)
 async def check_votes(interaction: discord.Interaction):
     data = load_data()
     channel_id = str(interaction.channel_id)
@@ -877,10 +2733,12 @@ async def check_votes(interaction: discord.Interaction):
     await interaction.response.send_message(embed=embed, ephemeral=True)
 
 @tree.command(description="Give Melodi a hug!")
+@response_budget()
 async def hug(interaction: discord.Interaction):
     await interaction.response.send_message(f"Aww, thanks for the hug {interaction.user.mention}!!! I appreciate it :3")
 
 @tree.command(description="Make her speak.")
+@response_budget(ephemeral=True)
 async def say(interaction: discord.Interaction, message: str, channel: discord.TextChannel = None, reply_to: str = None):
     
     if (interaction.user.id != RESPONSIBLE_PERSON):
@@ -903,7 +2761,80 @@ async def say(interaction: discord.Interaction, message: str, channel: discord.T
     
     await interaction.response.send_message("Message sent!", ephemeral=True)
 
+@tree.command(name="response_stats", description="Show how close each command gets to the response deadline")
+@response_budget(ephemeral=True)
+async def response_stats_report(interaction: discord.Interaction):
+    if interaction.user.id != RESPONSIBLE_PERSON:
+        await interaction.response.send_message("Nuh uh.", ephemeral=True)
+        return
+
+    lines = []
+    for stats in sorted(response_stats.values(), key=lambda x: x["average"] or 0, reverse=True):
+        if not stats["calls"]:
+            continue
+        lines.append(
+            f"`/{stats['name']}` {stats['calls']} calls, avg {stats['average'] or 0:.2f}s, slowest {stats['slowest']:.2f}s, "
+            f"{stats['auto_defers']} deferred, {stats['near_misses']} near misses, {stats['misses']} missed"
+        )
+
+    embed = discord.Embed(
+        title="⏱️ Response deadlines",
+        description="\n".join(lines) or "No commands have run yet.",
+        color=discord.Color.blue()
+    )
+    embed.set_footer(text=f"Budget {RESPONSE_BUDGET}s, Discord deadline {RESPONSE_DEADLINE}s")
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@tree.command(description="Profile the next invocations of a command")
+@app_commands.describe(command="Command to profile", invocations="How many invocations to profile", seconds="Profile for this many seconds instead", mode="cProfile traces every call, sampling is lighter")
+@app_commands.choices(mode=[app_commands.Choice(name="cProfile", value="cprofile"), app_commands.Choice(name="Sampling", value="sampling")])
+@response_budget(ephemeral=True)
+async def profile(interaction: discord.Interaction, command: str, invocations: int = 5, seconds: int = 0, mode: app_commands.Choice[str] = None):
+    global profile_session
+    if interaction.user.id != RESPONSIBLE_PERSON:
+        await interaction.response.send_message("Nuh uh.", ephemeral=True)
+        return
+
+    command = command.strip().lstrip("/")
+    if command not in profile_command_names():
+        await interaction.response.send_message(f"Unknown command `{command}`.", ephemeral=True)
+        return
+
+    if profile_session is not None:
+        await interaction.response.send_message(f"Already profiling `/{profile_session.command}`. Use /profile_stop first.", ephemeral=True)
+        return
+
+    if invocations < 1 or seconds < 0:
+        await interaction.response.send_message("Invocations must be at least 1 and seconds can't be negative.", ephemeral=True)
+        return
+
+    profile_session = ProfileSession(command, invocations, seconds, mode.value if mode else "cprofile")
+    scope = f"for {seconds}s" if seconds else f"for the next {invocations} invocation(s)"
+    await interaction.response.send_message(f"Profiling `/{command}` {scope}. The report will be sent to you by DM.", ephemeral=True)
+
+def profile_command_names() -> list:
+    return sorted(command.qualified_name for command in tree.walk_commands() if isinstance(command, app_commands.Command))
+
+@profile.autocomplete("command")
+async def profile_command_autocomplete(interaction: discord.Interaction, current: str) -> list:
+    return [app_commands.Choice(name=name, value=name) for name in profile_command_names() if current.lower() in name][:25]
+
+@tree.command(description="Stop profiling and send the report now")
+@response_budget(ephemeral=True)
+async def profile_stop(interaction: discord.Interaction):
+    if interaction.user.id != RESPONSIBLE_PERSON:
+        await interaction.response.send_message("Nuh uh.", ephemeral=True)
+        return
+
+    if profile_session is None:
+        await interaction.response.send_message("Nothing is being profiled.", ephemeral=True)
+        return
+
+    profile_session.finish()
+    await interaction.response.send_message("Profiling stopped, the report will be sent to you by DM.", ephemeral=True)
+
 @tree.command(description="Show current league standings")
+@response_budget()
 async def standings(interaction: discord.Interaction):
     data = load_data()
     channel_id = str(interaction.channel_id)
@@ -920,6 +2851,7 @@ async def standings(interaction: discord.Interaction):
         return
 
     standings_sorted = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    names = await resolve_display_names(interaction.guild, scores.keys())
 
     embed = discord.Embed(
         title=f"League Standings ({league['current_round']}/{league['max_rounds']} rounds played)",
@@ -927,13 +2859,243 @@ async def standings(interaction: discord.Interaction):
     )
 
     for rank, (player_id, points) in enumerate(standings_sorted, start=1):
-        member = interaction.guild.get_member(int(player_id))
-        name = member.display_name if member else f"User {player_id}"
+        name = names.get(player_id, f"User {player_id}")
         embed.add_field(name=f"#{rank} {name}", value=f"{points} pts", inline=False)
 
     await interaction.response.send_message(embed=embed)
 
+@tree.command(description="Show who votes for whom in this channel's league")
+@response_budget()
+async def league_insights(interaction: discord.Interaction):
+    data = load_data()
+    channel_id = str(interaction.channel_id)
+
+    if channel_id in data:
+        league = data[channel_id]
+    elif data.get("finished_leagues", {}).get(channel_id):
+        league = data["finished_leagues"][channel_id][-1]
+    else:
+        await interaction.response.send_message("No league in this channel. Use /create_league first.", ephemeral=True)
+        return
+
+    history = league.get("history", [])
+    if not history:
+        await interaction.response.send_message("No finished rounds with vote history yet!", ephemeral=True)
+        return
+
+    cache_key = (league_identity(league), len(history))
+    cached = insights_cache.get(channel_id)
+    if cached is not None and cached[0] == cache_key:
+        insights = cached[1]
+        insights_cache.move_to_end(channel_id)
+    else:
+        insights = compute_league_insights(history)
+        insights_cache[channel_id] = (cache_key, insights)
+        insights_cache.move_to_end(channel_id)
+        while len(insights_cache) > INSIGHTS_CACHE_SIZE:
+            insights_cache.popitem(last=False)
+
+    players = insights["players"]
+    names = await resolve_display_names(interaction.guild, players)
+    name = lambda pid: names.get(pid, f"User {pid}")
+
+    embed = discord.Embed(
+        title=f"🔍 League insights ({insights['rounds']} round{'s' if insights['rounds'] != 1 else ''})",
+        description="The full voter × submitter matrix is attached.",
+        color=discord.Color.purple()
+    )
+    embed.add_field(
+        name="Mutual admiration",
+        value="\n".join(f"{name(a)} ⇄ {name(b)} ({int(ab)} / {int(ba)} votes)" for a, b, ab, ba in insights["mutual_pairs"]) or "No mutual votes yet",
+        inline=False
+    )
+    embed.add_field(
+        name="Most generous (spread votes the widest)",
+        value="\n".join(f"{name(pid)}: {value:.0%} spread" for pid, value in insights["generous"]) or "Not enough votes yet",
+        inline=False
+    )
+    embed.add_field(
+        name="Most contrarian (least agreement with everyone else)",
+        value="\n".join(f"{name(pid)}: {value:+.2f} correlation" for pid, value in insights["contrarian"]) or "Not enough votes yet",
+        inline=False
+    )
+    embed.add_field(
+        name="Scores that rise and fall together",
+        value="\n".join(f"{name(a)} & {name(b)}: {value:+.2f}" for a, b, value in insights["correlated_pairs"]) or "Need at least 3 shared rounds",
+        inline=False
+    )
+
+    header = "Voter \\ Submitter," + ",".join(name(pid).replace(",", "") for pid in players) + "\n"
+    rows = [
+        name(pid).replace(",", "") + "," + ",".join(str(int(v)) for v in insights["matrix"][i]) + "\n"
+        for i, pid in enumerate(players)
+    ]
+    matrix_file = discord.File(fp=io.BytesIO((header + "".join(rows)).encode("utf-8")), filename="Vote_Matrix.csv")
+    await interaction.response.send_message(embed=embed, file=matrix_file)
+
+@tree.command(description="Search past submissions by title or artist")
+@app_commands.describe(query="Words (or the start of words) from a song title or artist")
+@response_budget()
+async def search(interaction: discord.Interaction, query: str):
+    if not search_tokens(query):
+        await interaction.response.send_message("Give me something to search for!", ephemeral=True)
+        return
+
+    results = search_index.search(query, limit=10, public_only=True)
+    if not results:
+        await interaction.response.send_message(f"No submissions found for \"{query}\".", ephemeral=True)
+        return
+
+    lines = []
+    for doc in results:
+        title = doc.get("title") or doc.get("url")
+        if len(title) > 80:
+            title = title[:77] + "..."
+        line = f"**[{title}]({doc.get('url')})** — {doc.get('artist', 'Unknown Artist')}\n"
+        if doc.get("placed"):
+            submitted = (doc.get("submitted_at") or "")[:10]
+            placement = f"#{doc['rank']} with {doc['votes']} votes" if doc.get("rank") else "no votes"
+            line += f"Submitted by <@{doc['player_id']}> on {submitted} | Round {doc['round']} ({doc['theme']}): {placement}"
+        else:
+            line += f"In the current round ({doc['theme']}), submitter hidden until the round ends"
+        lines.append(line)
+
+    embed = discord.Embed(title=f"🔎 Results for \"{query}\"", description="\n\n".join(lines), color=discord.Color.blue())
+    await interaction.response.send_message(embed=embed)
+
+stats_group = app_commands.Group(name="stats", description="All-time statistics across every league")
+
+STAT_METRICS = {
+    "points": "Career points",
+    "league_wins": "League wins",
+    "round_wins": "Round wins",
+    "submissions": "Songs submitted",
+    "votes_given": "Votes given",
+    "votes_received": "Votes received"
+}
+
+@stats_group.command(name="player", description="Show career statistics for a player")
+@response_budget()
+async def stats_player(interaction: discord.Interaction, user: discord.User = None):
+    user = user or interaction.user
+    player = get_stats()["players"].get(str(user.id))
+    if not player:
+        await interaction.response.send_message(f"{user.display_name} hasn't finished a round yet.", ephemeral=True)
+        return
+
+    embed = discord.Embed(title=f"📊 Career stats for {user.display_name}", color=discord.Color.blue())
+    embed.add_field(name="Leagues played", value=str(player["leagues_played"]), inline=True)
+    for key, label in STAT_METRICS.items():
+        embed.add_field(name=label, value=str(player[key]), inline=True)
+    await interaction.response.send_message(embed=embed)
+
+@stats_group.command(name="leaderboard", description="Show the all-time top players")
+@app_commands.choices(metric=[app_commands.Choice(name=label, value=key) for key, label in STAT_METRICS.items()])
+@response_budget()
+async def stats_leaderboard(interaction: discord.Interaction, metric: app_commands.Choice[str] = None):
+    key = metric.value if metric else "points"
+    players = get_stats()["players"]
+    top = heapq.nlargest(10, players.items(), key=lambda x: x[1][key])
+    if not top:
+        await interaction.response.send_message("No rounds have finished yet!")
+        return
+
+    names = await resolve_display_names(interaction.guild, [pid for pid, _ in top])
+    lines = [f"#{rank} {names.get(pid, f'User {pid}')}: {player[key]}" for rank, (pid, player) in enumerate(top, start=1)]
+    embed = discord.Embed(title=f"🏆 All-time leaderboard: {STAT_METRICS[key]}", description="\n".join(lines), color=discord.Color.gold())
+    await interaction.response.send_message(embed=embed)
+
+@stats_group.command(name="artists", description="Show the most submitted artists")
+@response_budget()
+async def stats_artists(interaction: discord.Interaction):
+    stats = get_stats()
+    top = heapq.nlargest(10, stats["artists"].items(), key=lambda x: x[1])
+    lines = [f"#{rank} {artist}: {count} submission{'s' if count != 1 else ''}" for rank, (artist, count) in enumerate(top, start=1)]
+    repeats = heapq.nlargest(5, stats["videos"].items(), key=lambda x: x[1]["count"])
+    repeat_lines = [f"[{video['title']}](https://youtu.be/{video_id}) — {video['count']}x" for video_id, video in repeats if video["count"] > 1]
+
+    embed = discord.Embed(title="🎤 Most submitted artists", description="\n".join(lines) or "No submissions yet", color=discord.Color.blue())
+    if repeat_lines:
+        embed.add_field(name="Most resubmitted songs", value="\n".join(repeat_lines), inline=False)
+    await interaction.response.send_message(embed=embed)
+
+@stats_group.command(name="themes", description="Show the most used round themes")
+@response_budget()
+async def stats_themes(interaction: discord.Interaction):
+    stats = get_stats()
+    top = heapq.nlargest(10, stats["themes"].items(), key=lambda x: x[1])
+    lines = [f"#{rank} {theme}: {count} round{'s' if count != 1 else ''}" for rank, (theme, count) in enumerate(top, start=1)]
+    embed = discord.Embed(
+        title=f"🎨 Themes ({stats['rounds']} rounds over {stats['leagues']} finished leagues)",
+        description="\n".join(lines) or "No rounds have finished yet!",
+        color=discord.Color.blue()
+    )
+    await interaction.response.send_message(embed=embed)
+
+@stats_group.command(name="rebuild", description="Recompute all statistics from league history")
+@response_budget(ephemeral=True)
+async def stats_rebuild(interaction: discord.Interaction):
+    global stats_cache
+    if interaction.user.id != RESPONSIBLE_PERSON:
+        await interaction.response.send_message("Nuh uh.", ephemeral=True)
+        return
+
+    await interaction.response.defer(thinking=True, ephemeral=True)
+    stats_cache = rebuild_stats(load_data())
+    save_stats(stats_cache)
+    await interaction.followup.send(f"Rebuilt statistics from {stats_cache['rounds']} rounds and {stats_cache['leagues']} finished leagues.", ephemeral=True)
+
+tree.add_command(stats_group)
+
+@tree.command(description="Re-fetch missing or unknown song details for all running rounds")
+@response_budget(ephemeral=True)
+async def refresh_metadata(interaction: discord.Interaction):
+    if interaction.user.id != RESPONSIBLE_PERSON:
+        await interaction.response.send_message("Nuh uh.", ephemeral=True)
+        return
+
+    await interaction.response.defer(thinking=True, ephemeral=True)
+
+    stale = []
+    for channel_id, league in load_data().items():
+        if channel_id == "finished_leagues" or not isinstance(league, dict) or not league.get("round"):
+            continue
+        for player_id, sub in league["round"]["submissions"].items():
+            if not sub.get("video_id") or sub.get("title", "Unknown Title") == "Unknown Title" or not sub.get("thumbnail"):
+                stale.append((channel_id, player_id, sub))
+
+    # lookups are gathered together so the batcher resolves them in as few videos.list calls as possible
+    infos = await asyncio.gather(*(lookup_youtube_info(sub["url"], sub.get("video_id")) for _, _, sub in stale))
+    updates = {}
+    for (channel_id, player_id, sub), info in zip(stale, infos):
+        if info.get("video_id") and info.get("title") != "Unknown Title":
+            updates[(channel_id, player_id, sub.get("submitted_at"))] = info
+
+    refreshed = {}
+
+    def apply(data):
+        refreshed["version"] = bump_search_version(data)
+        for (channel_id, player_id, submitted_at), info in updates.items():
+            league = data.get(channel_id)
+            round_data = league.get("round") if isinstance(league, dict) else None
+            sub = round_data["submissions"].get(player_id) if round_data else None
+            if not sub or sub.get("submitted_at") != submitted_at:
+                continue
+            for field in ("title", "thumbnail", "artist", "explicit", "video_id"):
+                sub[field] = info[field]
+            key = submission_doc_key(channel_id, player_id, sub)
+            if key in search_index.docs:
+                search_index.add(key, {**search_index.docs[key], "title": sub["title"], "artist": sub["artist"]})
+            invalidate_round_choices(channel_id)
+        return None
+
+    if updates:
+        update_data(apply)
+        search_index.schedule_save(refreshed["version"])
+    await interaction.followup.send(f"Checked {len(stale)} stale submission(s), refreshed {len(updates)}.", ephemeral=True)
+
 @tree.command(description="Remove a player's submission from the current round.")
+@response_budget(ephemeral=True)
 async def remove_submission(interaction: discord.Interaction, user: discord.Member):
     data = load_data()
     channel_id = str(interaction.channel_id)
@@ -953,8 +3115,41 @@ async def remove_submission(interaction: discord.Interaction, user: discord.Memb
         await interaction.response.send_message(f"{user.display_name} has not submitted a song this round.", ephemeral=True)
         return
 
-    del round_data["submissions"][player_id]
-    save_data(data)
+    removed = {}
+
+    def commit(data):
+        league = data.get(channel_id)
+        round_data = league.get("round") if isinstance(league, dict) else None
+        if not round_data or player_id not in round_data["submissions"]:
+            return f"{user.display_name} has not submitted a song this round."
+        removed["submission"] = round_data["submissions"].pop(player_id)
+        if player_id in round_data.get("submission_order", []):
+            round_data["submission_order"].remove(player_id)
+        # votes already cast for the removed song would otherwise still be tallied
+        votes = round_data.get("votes", {})
+        for voter in list(votes):
+            votes[voter].pop(player_id, None)
+            if not votes[voter]:
+                del votes[voter]
+        removed["round"] = round_data
+        removed["version"] = bump_search_version(data)
+        return None
+
+    error = update_data(commit)
+    if error is not None:
+        await interaction.response.send_message(error, ephemeral=True)
+        return
+
+    round_data = removed["round"]
+    search_index.remove(submission_doc_key(channel_id, player_id, removed["submission"]))
+    search_index.schedule_save(removed["version"])
+    invalidate_round_choices(channel_id)
+
+    if round_data.get("playlist_id"):
+        await sync_round_playlist(round_data)
     await interaction.response.send_message(f"Submission from {user.display_name} has been removed.", ephemeral=True)
 
-client.run(BOT_TOKEN)
\ No newline at end of file
+if __name__ == "__main__":
+    client.run(BOT_TOKEN)
+    # the client has closed; write out an index save that was still waiting on its delay
+    search_index.flush()
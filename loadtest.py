@@ -0,0 +1,371 @@
+# Load simulator: drives the real command handlers in bot.py with fake Discord
+# objects and stubbed YouTube/Google calls, so nothing touches real services.
+#
+#   python loadtest.py --leagues 50 --players 30 --window 60
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+ADMIN_ID = 1
+PLAYER_ROLE_ID = 2
+
+tmp_dir = tempfile.mkdtemp(prefix="loadtest_")
+os.environ["BOT_TOKEN"] = "loadtest"
+os.environ["DATA_FILE"] = os.path.join(tmp_dir, "data.json")
+os.environ["RESPONSIBLE_PERSON"] = str(ADMIN_ID)
+os.environ["PLAYER_ROLE"] = str(PLAYER_ROLE_ID)
+os.environ["YOUTUBE_CLIENT_ID"] = "loadtest"
+os.environ["YOUTUBE_CLIENT_SECRET"] = "loadtest"
+os.environ["YOUTUBE_REFRESH_TOKEN"] = "loadtest"
+
+import bot
+
+class Metrics:
+    def __init__(self):
+        self.first_response = {}
+        self.failures = {}
+        self.lock_waits = []
+        self.lock_holds = []
+        self.reads = 0
+        self.ytdlp_calls = 0
+        self.videos_list_calls = 0
+        self.writes = 0
+        self.loop_blocked = 0.0
+        self.longest_stall = 0.0
+
+    def record_response(self, command, elapsed):
+        self.first_response.setdefault(command, []).append(elapsed)
+
+    def record_failure(self, command, error):
+        key = f"{command}: {type(error).__name__}: {error}"
+        self.failures[key] = self.failures.get(key, 0) + 1
+
+metrics = Metrics()
+
+class TimedFileLock(bot.FileLock):
+    def acquire(self, *args, **kwargs):
+        start = time.perf_counter()
+        result = super().acquire(*args, **kwargs)
+        metrics.lock_waits.append(time.perf_counter() - start)
+        self.acquired_at = time.perf_counter()
+        return result
+
+    def release(self, *args, **kwargs):
+        if getattr(self, "acquired_at", None) is not None:
+            metrics.lock_holds.append(time.perf_counter() - self.acquired_at)
+            self.acquired_at = None
+        return super().release(*args, **kwargs)
+
+class FakeHTTPResponse:
+    def __init__(self, payload):
+        self.status_code = 200
+        self.payload = payload
+        self.text = ""
+
+    def json(self):
+        return self.payload
+
+def fake_info(video_id):
+    return {
+        "title": f"Song {video_id}",
+        "thumbnail": None,
+        "artist": f"Artist {int(video_id[1:]) % 97}",
+        "explicit": False,
+        "duration": 200,
+        "is_playlist": False,
+        "playlist_warning": None,
+        "video_id": video_id
+    }
+
+def install_stubs(youtube_latency, api_latency):
+    def fake_fetch_youtube_info(url):
+        time.sleep(youtube_latency)
+        metrics.ytdlp_calls += 1
+        return fake_info(url.rsplit("=", 1)[-1])
+
+    def unstubbed(method, url):
+        # bot.py catches request errors and carries on, so record it where the report shows it
+        error = RuntimeError(f"unstubbed {method} {url}")
+        metrics.record_failure("requests", error)
+        raise error
+
+    def fake_post(url, **kwargs):
+        # blocking on purpose: bot.py calls requests synchronously
+        time.sleep(api_latency)
+        if url == "https://oauth2.googleapis.com/token":
+            return FakeHTTPResponse({"access_token": "loadtest"})
+        if url == "https://www.googleapis.com/youtube/v3/playlists":
+            return FakeHTTPResponse({"id": f"PL{random.randrange(10**9)}"})
+        if url == "https://www.googleapis.com/youtube/v3/playlistItems":
+            return FakeHTTPResponse({"id": f"PLI{random.randrange(10**9)}"})
+        unstubbed("POST", url)
+
+    def fake_get(url, params=None, **kwargs):
+        time.sleep(api_latency)
+        if url == "https://www.googleapis.com/youtube/v3/playlistItems":
+            return FakeHTTPResponse({"items": []})
+        if url != "https://www.googleapis.com/youtube/v3/videos":
+            unstubbed("GET", url)
+        metrics.videos_list_calls += 1
+        items = []
+        for video_id in params["id"].split(","):
+            info = fake_info(video_id)
+            items.append({
+                "id": video_id,
+                "snippet": {"title": info["title"], "channelTitle": info["artist"], "thumbnails": {}},
+                "contentDetails": {"duration": "PT3M20S", "contentRating": {}}
+            })
+        return FakeHTTPResponse({"items": items})
+
+    def fake_put(url, **kwargs):
+        time.sleep(api_latency)
+        if url == "https://www.googleapis.com/youtube/v3/playlistItems":
+            return FakeHTTPResponse({})
+        unstubbed("PUT", url)
+
+    def fake_delete(url, **kwargs):
+        time.sleep(api_latency)
+        if url == "https://www.googleapis.com/youtube/v3/playlistItems":
+            response = FakeHTTPResponse({})
+            response.status_code = 204
+            return response
+        unstubbed("DELETE", url)
+
+    bot.fetch_youtube_info = fake_fetch_youtube_info
+    # replaces bot.py's reference only, so the shared requests module stays untouched
+    # and any request method bot.py starts using without a stub fails immediately
+    bot.requests = SimpleNamespace(post=fake_post, get=fake_get, put=fake_put, delete=fake_delete)
+    bot.FileLock = TimedFileLock
+
+    load_data, save_data = bot.load_data, bot.save_data
+
+    def counted_load():
+        metrics.reads += 1
+        return load_data()
+
+    def counted_save(data):
+        metrics.writes += 1
+        return save_data(data)
+
+    bot.load_data = counted_load
+    bot.save_data = counted_save
+
+class FakeMessage:
+    def __init__(self):
+        self.id = random.randrange(10**17)
+
+    async def pin(self):
+        pass
+
+    async def reply(self, **kwargs):
+        return FakeMessage()
+
+class FakeRole:
+    def __init__(self, role_id):
+        self.id = role_id
+        self.mention = f"<@&{role_id}>"
+
+class FakeMember:
+    def __init__(self, user_id, admin=False):
+        self.id = user_id
+        self.display_name = f"Player {user_id}"
+        self.mention = f"<@{user_id}>"
+        self.guild_permissions = SimpleNamespace(manage_messages=admin)
+
+class FakeGuild:
+    def __init__(self):
+        self.id = 1000
+        self.members = []
+        self.role = FakeRole(PLAYER_ROLE_ID)
+
+    def get_role(self, role_id):
+        return self.role
+
+    def get_member(self, user_id):
+        return FakeMember(user_id)
+
+    async def fetch_member(self, user_id):
+        return FakeMember(user_id)
+
+class FakeChannel:
+    def __init__(self, channel_id, guild):
+        self.id = channel_id
+        self.guild = guild
+
+    async def send(self, *args, **kwargs):
+        return FakeMessage()
+
+    async def fetch_message(self, message_id):
+        return FakeMessage()
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self.done = False
+
+    def is_done(self):
+        return self.done
+
+    def acknowledge(self):
+        if self.done:
+            raise RuntimeError("Interaction has already been responded to")
+        self.done = True
+        metrics.record_response(self.interaction.command_name, time.perf_counter() - self.interaction.created)
+
+    async def send_message(self, *args, **kwargs):
+        self.acknowledge()
+        return FakeMessage()
+
+    async def defer(self, *args, **kwargs):
+        self.acknowledge()
+
+    async def edit_message(self, *args, **kwargs):
+        self.acknowledge()
+
+    async def send_modal(self, modal):
+        self.acknowledge()
+
+class FakeFollowup:
+    async def send(self, *args, **kwargs):
+        return FakeMessage()
+
+class FakeInteraction:
+    def __init__(self, command, user, channel):
+        self.command = command
+        self.command_name = command.name
+        self.created = time.perf_counter()
+        self.user = user
+        self.channel = channel
+        self.channel_id = channel.id
+        self.guild = channel.guild
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup()
+
+    async def edit_original_response(self, **kwargs):
+        return FakeMessage()
+
+    async def delete_original_response(self):
+        pass
+
+async def invoke(command, user, channel, **kwargs):
+    interaction = FakeInteraction(command, user, channel)
+    try:
+        await command.callback(interaction, **kwargs)
+    except Exception as e:
+        metrics.record_failure(command.name, e)
+    if not interaction.response.is_done():
+        metrics.record_failure(command.name, RuntimeError("no response sent"))
+
+async def monitor_loop(interval, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = time.perf_counter() - start - interval
+        if lag > 0:
+            metrics.loop_blocked += lag
+            metrics.longest_stall = max(metrics.longest_stall, lag)
+
+async def spread(coros, window):
+    async def delayed(coro, delay):
+        await asyncio.sleep(delay)
+        await coro
+
+    await asyncio.gather(*(delayed(coro, random.uniform(0, window)) for coro in coros))
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+async def run(args):
+    guild = FakeGuild()
+    admin = FakeMember(ADMIN_ID, admin=True)
+    channels = [FakeChannel(10**6 + i, guild) for i in range(args.leagues)]
+    players = {channel.id: [FakeMember(10**7 + i * args.players + j) for j in range(args.players)] for i, channel in enumerate(channels)}
+
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_loop(0.01, stop))
+
+    print(f"Setting up {args.leagues} leagues x {args.players} players in {tmp_dir}")
+    for channel in channels:
+        await invoke(bot.create_league, admin, channel, rounds=1, votes_per_player=args.votes, max_players=0)
+        for player in players[channel.id]:
+            await invoke(bot.join_league, player, channel)
+        await invoke(bot.start_round, admin, channel, theme="Load test")
+
+    for phase in ("submit", "start_voting", "vote", "end_round"):
+        start = time.perf_counter()
+        if phase == "submit":
+            coros = [
+                invoke(bot.submit, player, channel, url=f"https://youtube.com/watch?v=v{player.id}")
+                for channel in channels for player in players[channel.id]
+            ]
+            await spread(coros, args.window)
+        elif phase == "vote":
+            data = bot.load_data()
+            coros = []
+            for channel in channels:
+                order = data[str(channel.id)]["round"]["submission_order"]
+                for player in players[channel.id]:
+                    choices = [number for number, pid in enumerate(order, start=1) if pid != str(player.id)]
+                    for number in random.sample(choices, min(args.votes, len(choices))):
+                        coros.append(invoke(bot.vote, player, channel, number=number, amount=1))
+            await spread(coros, args.window)
+        else:
+            command = getattr(bot, phase)
+            await asyncio.gather(*(invoke(command, admin, channel) for channel in channels))
+        print(f"  {phase}: finished in {time.perf_counter() - start:.2f}s")
+
+    stop.set()
+    await monitor
+    report()
+
+    # lost updates show up as leagues that never reached the archive
+    finished = bot.load_data().get("finished_leagues", {})
+    print(f"Leagues archived: {len(finished)}/{args.leagues}")
+
+def report():
+    print("\nTime to first response")
+    print(f"  {'command':<14}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'>3s':>6}")
+    for command, values in metrics.first_response.items():
+        late = sum(1 for v in values if v > 3)
+        print(f"  {command:<14}{len(values):>8}{percentile(values, 0.5) * 1000:>10.1f}{percentile(values, 0.99) * 1000:>10.1f}{max(values) * 1000:>10.1f}{late:>6}")
+
+    print("\nResponse budget (handler's own first reply)")
+    for stats in bot.response_stats.values():
+        if stats["calls"]:
+            print(f"  {stats['name']:<14}avg {stats['average'] or 0:.2f}s, slowest {stats['slowest']:.2f}s, {stats['auto_defers']} auto-deferred, {stats['near_misses']} near misses, {stats['misses']} missed")
+
+    total = sum(len(values) for values in metrics.first_response.values())
+    print(f"\nCompleted commands: {total}")
+    print(f"Event loop blocked: {metrics.loop_blocked:.2f}s total, longest stall {metrics.longest_stall * 1000:.1f}ms")
+    print(f"YouTube metadata: {metrics.videos_list_calls} videos.list requests, {metrics.ytdlp_calls} yt-dlp fallbacks")
+    print(f"State file: {metrics.reads} reads, {metrics.writes} writes, final size {os.path.getsize(bot.DATA_FILE) / 1024:.1f} KiB")
+    if metrics.lock_waits:
+        print(f"File locks: {len(metrics.lock_waits)} acquisitions, wait p99 {percentile(metrics.lock_waits, 0.99) * 1000:.1f}ms, hold p50/p99 {percentile(metrics.lock_holds, 0.5) * 1000:.1f}/{percentile(metrics.lock_holds, 0.99) * 1000:.1f}ms")
+    if metrics.failures:
+        print("\nFailures")
+        for key, count in sorted(metrics.failures.items(), key=lambda x: x[1], reverse=True):
+            print(f"  {count}x {key}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many leagues playing a round at once")
+    parser.add_argument("--leagues", type=int, default=50)
+    parser.add_argument("--players", type=int, default=30)
+    parser.add_argument("--votes", type=int, default=5, help="votes per player, cast one /vote at a time")
+    parser.add_argument("--window", type=float, default=60, help="seconds over which submissions and votes are spread")
+    parser.add_argument("--youtube-latency", type=float, default=0.5, help="seconds per stubbed yt-dlp lookup")
+    parser.add_argument("--api-latency", type=float, default=0.1, help="seconds per stubbed Google API request")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    install_stubs(args.youtube_latency, args.api_latency)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+# Listening party check: plays local <video_id>.wav files through the real
+# ListeningParty/resolve_local_track path with a fake voice client, and checks
+# every next track was already prepared before the current one finished.
+# Needs ffmpeg on PATH, like the bot itself.
+#
+#   python partytest.py --tracks 4 --seconds 1.5
+import argparse
+import asyncio
+import math
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+tracks_dir = tempfile.mkdtemp(prefix="partytest_")
+os.environ["LISTENING_PARTY_LOCAL_DIR"] = tracks_dir
+
+import loadtest
+bot = loadtest.bot
+
+FRAME_SECONDS = 0.02
+
+def write_tone(path, seconds, frequency):
+    rate = 48000
+    with wave.open(path, "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        samples = (int(8000 * math.sin(2 * math.pi * frequency * i / rate)) for i in range(int(rate * seconds)))
+        f.writeframes(b"".join(struct.pack("<hh", s, s) for s in samples))
+
+class FakeVoiceClient:
+    # plays sources on a thread at real-time pace, like discord.py's AudioPlayer
+    def __init__(self, guild):
+        self.guild = guild
+        self.connected = True
+        self.player = None
+        self.stopping = threading.Event()
+        self.party = None
+        self.plays = []
+        self.prefetched_in_time = []
+
+    def is_connected(self):
+        return self.connected
+
+    def is_playing(self):
+        return self.player is not None and self.player.is_alive()
+
+    def play(self, source, after=None):
+        if not self.connected:
+            raise bot.discord.ClientException("Not connected to voice.")
+        self.plays.append(time.perf_counter())
+        self.stopping.clear()
+        self.player = threading.Thread(target=self.run, args=(source, after, self.party.index), daemon=True)
+        self.player.start()
+
+    def run(self, source, after, index):
+        frames = 0
+        while not self.stopping.is_set():
+            if not source.read():
+                break
+            frames += 1
+            time.sleep(FRAME_SECONDS)
+        # the next track must be resolved and buffered before this one runs out
+        if index + 1 < len(self.party.tracks):
+            self.prefetched_in_time.append(self.party.pending is not None and self.party.pending.done())
+        source.cleanup()
+        after(None)
+
+    def stop(self):
+        self.stopping.set()
+
+    async def disconnect(self, force=False):
+        self.connected = False
+
+async def run(args):
+    video_ids = [f"party{i}" for i in range(args.tracks)]
+    for i, video_id in enumerate(video_ids):
+        write_tone(os.path.join(tracks_dir, f"{video_id}.wav"), args.seconds, 220 * (i + 1))
+
+    resolved = []
+
+    def recording_resolver(submission):
+        location, is_stream = bot.resolve_local_track(submission)
+        resolved.append(os.path.basename(location))
+        return location, is_stream
+
+    guild = loadtest.FakeGuild()
+    channel = loadtest.FakeChannel(1, guild)
+    voice_client = FakeVoiceClient(guild)
+    tracks = [(number, {"video_id": video_id, "title": f"Song {video_id}"}) for number, video_id in enumerate(video_ids, start=1)]
+    party = bot.ListeningParty(voice_client, channel, tracks, resolver=recording_resolver)
+    voice_client.party = party
+    bot.listening_parties[guild.id] = party
+
+    start = time.perf_counter()
+    await party.start()
+    while not party.stopped:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+
+    gaps = [later - earlier - args.seconds for earlier, later in zip(voice_client.plays, voice_client.plays[1:])]
+    print(f"Played {len(voice_client.plays)}/{len(tracks)} tracks in {elapsed:.2f}s from {tracks_dir}")
+    print(f"Resolved in order: {', '.join(resolved)}")
+    if gaps:
+        print(f"Gap between tracks: max {max(gaps) * 1000:.0f}ms")
+
+    failures = []
+    if bot.track_resolver is not bot.resolve_local_track:
+        failures.append("LISTENING_PARTY_LOCAL_DIR did not select resolve_local_track")
+    if resolved != [f"{video_id}.wav" for video_id in video_ids]:
+        failures.append("tracks were not resolved from the local directory in order")
+    if len(voice_client.plays) != len(tracks):
+        failures.append("not every track was played")
+    if not all(voice_client.prefetched_in_time) or len(voice_client.prefetched_in_time) != len(tracks) - 1:
+        failures.append(f"next track not ready before the current one ended: {voice_client.prefetched_in_time}")
+    if guild.id in bot.listening_parties:
+        failures.append("party still registered after it finished")
+    if voice_client.connected:
+        failures.append("voice client was not disconnected")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Play local tracks through a listening party and check prefetching")
+    parser.add_argument("--tracks", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=1.5, help="length of each generated track")
+    args = parser.parse_args()
+
+    if shutil.which("ffmpeg") is None:
+        print("ffmpeg was not found on PATH, can't decode the local tracks")
+        return 1
+
+    failures = asyncio.run(run(args))
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    print("OK" if not failures else f"{len(failures)} check(s) failed")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())